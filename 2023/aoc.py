@@ -0,0 +1,230 @@
+"""Run the solvers of every day in parallel and print the answers in order.
+
+Usage:
+    python aoc.py                               # every day_N.py next to this file
+    python aoc.py 3 5 -j 2                      # only days 3 and 5, on two worker processes
+    cat huge.txt | python aoc.py 1 --stream -   # solve both parts of day 1 in one pass over stdin
+    python aoc.py 7 --profile --sample 0.001    # write cProfile, tracemalloc and flame graph captures of day 7
+    python aoc.py 5 --trace 5=debug             # log the debug messages of day 5 to stderr
+    python aoc.py 1 --incremental               # only read what was appended to the input since the last run
+
+Answers are memoized and parsed inputs cached (see the cache module): days whose input and solver code did
+not change since the last run are printed straight away. --no-cache recomputes them from a fresh parse of
+the input, so do --profile and --trace. Running a day on its own, `python day_3.py`, goes through the same
+memo and takes --no-cache as well.
+"""
+import argparse
+import contextlib
+import importlib
+import os
+import re
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, NamedTuple
+
+from cache import NO_CACHE_VARIABLE, AnswerMemo, cached_parse, parse_cache_disabled
+from profiling import ProfileOptions, profile_call
+from tracing import configure as configure_tracing, parse_trace
+from utils import get_input
+
+# Solver functions we look for in every day module and the part(s) they answer.
+SOLVERS = {
+    "solve_part_one": "1",
+    "solve_part_two": "2",
+    "solve_part_one_and_two": "1+2",
+}
+
+# The arguments each day's ``__main__`` block hands to its solvers.
+# Days that are missing here read their own input and take no arguments.
+ARGUMENTS: dict[int, Callable[[ModuleType], tuple]] = {
+    4: lambda module: (cached_parse(4, module.parse_input),),
+    5: lambda module: (cached_parse(5, module.parse_input),),
+    6: lambda module: (get_input(6).splitlines(),),
+    7: lambda module: (get_input(7).splitlines(),),
+    8: lambda module: (get_input(8, iterator=True),),
+    # The map is closed once the job is done and nothing refers to it any more.
+    9: lambda module: (get_input(9, mapped=True).lines(),),
+}
+
+
+class Job(NamedTuple):
+    day: int
+    part: str
+    solver: str
+
+
+def find_days() -> list[int]:
+    """Return the days that have a day_N.py solver module, in order."""
+    days = []
+    for path in Path(__file__).parent.glob("day_*.py"):
+        if match := re.fullmatch(r"day_(\d+)\.py", path.name):
+            days.append(int(match.group(1)))
+    return sorted(days)
+
+
+def find_jobs(days: list[int]) -> list[Job]:
+    """Return one job per solver function found in the given days."""
+    jobs = []
+    for day in days:
+        module = importlib.import_module(f"day_{day}")
+        for solver, part in SOLVERS.items():
+            if hasattr(module, solver):
+                jobs.append(Job(day, part, solver))
+    return jobs
+
+
+def call_solver(day: int, solver: str) -> Any:
+    """Load the arguments of a solver and call it."""
+    module = importlib.import_module(f"day_{day}")
+    args = ARGUMENTS.get(day, lambda module: ())(module)
+    return getattr(module, solver)(*args)
+
+
+def run_job(
+    day: int, solver: str, profile: ProfileOptions | None = None, trace: dict[int, int] | None = None
+) -> tuple[Any, float]:
+    """Run a single solver and return its answer along with the wall time it took.
+
+    With `profile` the solver runs under the profilers instead, and the time includes their overhead.
+    `trace` maps days to the level their tracing is switched on at, see the tracing module.
+    """
+    if trace:
+        configure_tracing(trace)
+
+    start = time.perf_counter()
+    if profile is None:
+        answer = call_solver(day, solver)
+    else:
+        name = f"day_{day}_part_{SOLVERS[solver]}"
+        answer = profile_call(lambda: call_solver(day, solver), name, profile)
+    return answer, time.perf_counter() - start
+
+
+def run_day(day: int, argv: list[str] | None = None) -> None:
+    """Print the answers of a day, one per line, for the `__main__` block of its module.
+
+    Answers come from the memo when neither the input nor the code changed since they were computed,
+    otherwise the solvers run in this process. With --no-cache, or `AOC_NO_CACHE` set, they always run,
+    on a fresh parse of the input.
+    """
+    parser = argparse.ArgumentParser(description=f"Print the answers of day {day}.")
+    parser.add_argument("--no-cache", action="store_true", help="recompute the answers, from a freshly parsed input, instead of using the memoized ones")
+    args = parser.parse_args(argv)
+    use_memo = not (args.no_cache or os.environ.get(NO_CACHE_VARIABLE))
+
+    memo = AnswerMemo()
+    with parse_cache_disabled() if not use_memo else contextlib.nullcontext():
+        for job in find_jobs([day]):
+            key = AnswerMemo.key(day, job.part, f"day_{day}")
+            answer = memo.get(key) if use_memo else None
+            if answer is None:
+                answer, _ = run_job(day, job.solver)
+                memo.put(key, answer)
+            for part_answer in answer if isinstance(answer, tuple) else (answer,):
+                print(part_answer)
+    memo.save()
+
+
+def run_stream(day: int, path: str) -> None:
+    """Feed a file (or stdin for '-') line by line to the streaming solver of a day and print both answers."""
+    module = importlib.import_module(f"day_{day}")
+    if not hasattr(module, "solve_stream"):
+        raise SystemExit(f"Day {day} has no streaming solver")
+
+    start = time.perf_counter()
+    with open(path) if path != "-" else contextlib.nullcontext(sys.stdin) as lines:
+        part_one, part_two = module.solve_stream(lines)
+    elapsed = time.perf_counter() - start
+    print(f"Day {day:>2} part 1   {elapsed * 1000:>10.1f} ms  {part_one}")
+    print(f"Day {day:>2} part 2   {elapsed * 1000:>10.1f} ms  {part_two}")
+
+
+def run_incremental(day: int) -> None:
+    """Solve a day from its last checkpoint and print both answers."""
+    # Imported here: it imports the day modules it supports, which the other modes do in the workers.
+    from incremental import TALLIES, solve_incremental
+
+    if day not in TALLIES:
+        raise SystemExit(f"Day {day} can't be solved incrementally")
+
+    start = time.perf_counter()
+    answers = solve_incremental(day)
+    elapsed = time.perf_counter() - start
+    print(f"Day {day:>2} part 1   {elapsed * 1000:>10.1f} ms  {answers.part_one}")
+    print(f"Day {day:>2} part 2   {elapsed * 1000:>10.1f} ms  {answers.part_two}")
+    print(f"Read {answers.new_bytes} new bytes")
+    if answers.pending:
+        print(f"Left out {answers.pending} bytes of an unterminated last line, still pending")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("days", nargs="*", type=int, help="days to run (default: all)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--stream", metavar="FILE", help="solve a single day in one pass over FILE ('-' for stdin)")
+    parser.add_argument(
+        "--profile", metavar="DIR", nargs="?", const=Path(__file__).parent / "profiles", type=Path,
+        help="profile every job and write the captures to DIR (default: profiles/)",
+    )
+    parser.add_argument("--sample", metavar="SECONDS", type=float, help="with --profile, also sample stacks for a flame graph at this interval")
+    parser.add_argument(
+        "--trace", metavar="DAY[=LEVEL]", action="append", type=parse_trace, default=[],
+        help="log the trace messages of DAY to stderr, from LEVEL up (default: TRACE, the most verbose)",
+    )
+    parser.add_argument("--incremental", action="store_true", help="solve a single day from the checkpoint of its last incremental run")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every answer, from freshly parsed inputs, instead of using the memoized ones")
+    args = parser.parse_args(argv)
+
+    trace = dict(args.trace)
+    profile = ProfileOptions(args.profile, args.sample) if args.profile else None
+
+    if args.incremental:
+        if len(args.days) != 1:
+            parser.error("--incremental needs exactly one day")
+        run_incremental(args.days[0])
+        return
+
+    if args.stream:
+        if len(args.days) != 1:
+            parser.error("--stream needs exactly one day")
+        configure_tracing(trace)
+        run_stream(args.days[0], args.stream)
+        return
+
+    jobs = find_jobs(args.days or find_days())
+
+    start = time.perf_counter()
+    memo = AnswerMemo()
+    keys = [AnswerMemo.key(job.day, job.part, f"day_{job.day}") for job in jobs]
+    # Profiling and tracing are only useful when the solvers actually run.
+    use_memo = not (args.no_cache or profile or trace)
+
+    # The workers inherit the environment, and with it the bypass of the parse cache.
+    parse_cache = parse_cache_disabled() if not use_memo else contextlib.nullcontext()
+    with parse_cache, ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = []
+        for job, key in zip(jobs, keys):
+            answer = memo.get(key) if use_memo else None
+            futures.append(answer if answer is not None else executor.submit(run_job, job.day, job.solver, profile, trace))
+
+        # Wait on the futures in submission order so the output stays sorted by day and part,
+        # while the pool keeps working on everything else in the background.
+        for job, key, future in zip(jobs, keys, futures):
+            if isinstance(future, Future):
+                answer, elapsed = future.result()
+                memo.put(key, answer)
+                print(f"Day {job.day:>2} part {job.part:<3} {elapsed * 1000:>10.1f} ms  {answer}")
+            else:
+                print(f"Day {job.day:>2} part {job.part:<3} {'memoized':>13}  {future}")
+
+    memo.save()
+    print(f"Total wall time: {(time.perf_counter() - start) * 1000:.1f} ms")
+    if profile:
+        print(f"Profiles written to {profile.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Benchmark every solver on the real inputs and on generated inputs a number of times bigger.
+
+For every day, part and scale this reports the median and p95 wall time over a number of runs,
+along with the peak memory traced during one extra run. The parse cache is bypassed, so every run parses its
+input again. The results can be saved as a JSON baseline, and later runs print how far they are from it.
+
+Usage:
+    python bench.py                        # all days at 1x, 10x, 100x and 1000x
+    python bench.py 5 7 --scales 1 10      # only days 5 and 7, real inputs and 10x
+    python bench.py --save                 # also store the results as the new baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from aoc import find_days, find_jobs, run_job
+from cache import parse_cache_disabled
+from generators import GENERATORS, generate, scaled_size
+from utils import INPUTS_DIR_VARIABLE
+
+DEFAULT_SCALES = [1, 10, 100, 1000]
+
+DEFAULT_BASELINE = Path(__file__).parent / "bench_baseline.json"
+
+
+# Day 6 is a handful of races whose part two concatenates every number, past the range of the float
+# arithmetic of its solver, so it only runs on the real input.
+SCALED_DAYS = [day for day in GENERATORS if day != 6]
+
+
+def write_scaled_inputs(days: list[int], scale: int, directory: Path, seed: int) -> list[int]:
+    """Generate the inputs of the given days at the given scale and return the days that could be scaled."""
+    scaled = []
+    for day in days:
+        if day in SCALED_DAYS:
+            generated = generate(day, scaled_size(day, scale), seed)
+            (directory / f"day_{day}.txt").write_text(generated.text)
+            scaled.append(day)
+    return scaled
+
+
+def measure(day: int, solver: str, repeat: int) -> dict[str, float]:
+    """Time a solver over a number of runs, then trace its memory during one more run.
+
+    Every run parses the input: a parse cache warmed by the first run would leave the others only
+    loading a pickle.
+    """
+    timings = []
+    with parse_cache_disabled():
+        for _ in range(repeat):
+            timings.append(run_job(day, solver)[1])
+
+        tracemalloc.start()
+        try:
+            run_job(day, solver)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "median": statistics.median(timings),
+        "p95": statistics.quantiles(timings, n=20, method="inclusive")[-1] if len(timings) > 1 else timings[0],
+        "peak_memory": peak_memory,
+    }
+
+
+def format_change(result: dict[str, float], baseline: dict[str, float] | None) -> str:
+    """Return the relative change of the median compared to the baseline."""
+    if baseline is None:
+        return "new"
+    return f"{(result['median'] - baseline['median']) / baseline['median']:+.1%}"
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("days", nargs="*", type=int, help="days to benchmark (default: all)")
+    parser.add_argument("--scales", nargs="+", type=int, default=DEFAULT_SCALES, help="input scales to run (1 is the real input)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated inputs")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs per solver")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="JSON file to compare against")
+    parser.add_argument("--save", action="store_true", help="write the results to the baseline file")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    results = {}
+    days = args.days or find_days()
+
+    print(f"{'job':<24} {'median ms':>12} {'p95 ms':>12} {'peak MiB':>10} {'vs baseline':>12}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as directory:
+            if scale == 1:
+                scaled_days = days
+            else:
+                scaled_days = write_scaled_inputs(days, scale, Path(directory), args.seed)
+                os.environ[INPUTS_DIR_VARIABLE] = directory
+
+            try:
+                for job in find_jobs(scaled_days):
+                    key = f"day_{job.day}/part_{job.part}/x{scale}"
+                    result = results[key] = measure(job.day, job.solver, args.repeat)
+                    print(
+                        f"{key:<24} {result['median'] * 1000:>12.1f} {result['p95'] * 1000:>12.1f} "
+                        f"{result['peak_memory'] / 2**20:>10.1f} {format_change(result, baseline.get(key)):>12}"
+                    )
+            finally:
+                os.environ.pop(INPUTS_DIR_VARIABLE, None)
+
+    if args.save:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
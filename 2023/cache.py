@@ -0,0 +1,148 @@
+"""On-disk caches that let repeated runs skip work they have already done.
+
+Parsed inputs are pickled into `.cache/parsed/`, one file per day and parser. Every entry records a hash of
+the input file and of the source of the module that defines the parser, so editing either one makes the
+entry stale; the next parse then replaces it.
+
+Setting the `AOC_NO_CACHE` environment variable, e.g. with `parse_cache_disabled()`, makes every parse run
+again without touching the cache; the runner does so for --no-cache, --profile and --trace and the
+benchmarks always do, so that they time the parsers rather than loading pickles. Entries of parsers that
+no longer exist are deleted whenever another parser of the same day is called.
+
+Answers are memoized in `.cache/answers.pickle`, keyed by day, part, the hash of the input file and the
+hashes of the source of the solver module and of the modules shared by every day. Only the most recently
+used ones are kept.
+"""
+import contextlib
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from utils import get_input, get_input_path
+
+T = TypeVar("T")
+
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+# Parse every input again instead of using the parse cache, when set to anything but an empty string.
+NO_CACHE_VARIABLE = "AOC_NO_CACHE"
+
+MAX_ANSWERS = 256
+
+# Modules that every solver may rely on, editing them makes all memoized answers stale.
+SHARED_MODULES = ("utils", "cache")
+
+
+def hash_file(path: Path) -> str:
+    """Return the hash of the contents of a file."""
+    with path.open("rb") as file:
+        return hashlib.file_digest(file, "blake2b").hexdigest()
+
+
+def hash_source(module_name: str) -> str:
+    """Return the hash of the source code of a loaded module."""
+    return hashlib.blake2b(inspect.getsource(sys.modules[module_name]).encode()).hexdigest()
+
+
+def write_atomically(path: Path, data: bytes) -> None:
+    """Write a file in one go, so that processes running in parallel never see half of it."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+@contextlib.contextmanager
+def parse_cache_disabled() -> Iterator[None]:
+    """Bypass the parse cache in this process, and in the processes it starts, until the block is left."""
+    previous = os.environ.get(NO_CACHE_VARIABLE)
+    os.environ[NO_CACHE_VARIABLE] = "1"
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ[NO_CACHE_VARIABLE]
+        else:
+            os.environ[NO_CACHE_VARIABLE] = previous
+
+
+def cached_parse(day: int, parser: Callable[[str], T]) -> T:
+    """Return `parser(input)` for the input of the given day, loading it from the cache when possible.
+
+    The parsed structure has to be picklable; classes defined in the day module are fine.
+    """
+    if os.environ.get(NO_CACHE_VARIABLE):
+        return parser(get_input(day))
+
+    key = (hash_file(get_input_path(day)), hash_source(parser.__module__))
+    # Days always run as imported modules, even as scripts (see `aoc.run_day`), so the day names the module.
+    # Names of an older layout, with the module in them, don't resolve to a parser and are evicted.
+    prefix = f"day_{day}."
+    path = CACHE_DIR / "parsed" / f"{prefix}{parser.__qualname__}.pickle"
+    evict_removed_parsers(path.parent, prefix, sys.modules[parser.__module__])
+
+    try:
+        with path.open("rb") as file:
+            # The key comes first, so a stale entry is dropped without unpickling all of it.
+            if pickle.load(file) == key:
+                return pickle.load(file)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        pass
+
+    parsed = parser(get_input(day))
+    data = pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL) + pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL)
+    write_atomically(path, data)
+    return parsed
+
+
+def evict_removed_parsers(directory: Path, prefix: str, module: Any) -> None:
+    """Delete the entries under `prefix` whose parser is no longer defined in the module."""
+    for entry in directory.glob(f"{prefix}*.pickle"):
+        qualname = entry.name[len(prefix):-len(".pickle")]
+        target = module
+        for name in qualname.split("."):
+            target = getattr(target, name, None)
+        if target is None:
+            entry.unlink(missing_ok=True)
+
+
+class AnswerMemo:
+    """Answers of earlier runs, in least recently used order.
+
+    The memo is read and written by a single process, the runner, so the pool workers never race on it.
+    """
+
+    def __init__(self, path: Path = CACHE_DIR / "answers.pickle", max_entries: int = MAX_ANSWERS):
+        self.path = path
+        self.max_entries = max_entries
+        try:
+            self._answers = pickle.loads(path.read_bytes())
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            self._answers = OrderedDict()
+
+    @staticmethod
+    def key(day: int, part: str, module_name: str) -> tuple[int | str, ...]:
+        """Return the key of the answer of a day and part, for the current input and solver code."""
+        shared = (hash_source(name) for name in SHARED_MODULES)
+        return day, part, hash_file(get_input_path(day)), hash_source(module_name), *shared
+
+    def get(self, key: tuple) -> Any:
+        """Return the memoized answer, or None if there is none."""
+        if key not in self._answers:
+            return None
+        self._answers.move_to_end(key)
+        return self._answers[key]
+
+    def put(self, key: tuple, answer: Any) -> None:
+        self._answers[key] = answer
+        self._answers.move_to_end(key)
+        while len(self._answers) > self.max_entries:
+            self._answers.popitem(last=False)
+
+    def save(self) -> None:
+        write_atomically(self.path, pickle.dumps(self._answers, protocol=pickle.HIGHEST_PROTOCOL))
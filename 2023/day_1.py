@@ -43,7 +43,13 @@ zoneight234
 In this example, the calibration values are 29, 83, 13, 24, 42, 14, and 76. Adding these together produces 281.
 """
 
-from utils import get_input
+from collections import deque
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from utils import MappedInput, get_input, get_input_path, nonblank_lines, sum_over_line_ranges
 
 VALID_NUMBERS = {
     "one": "1", 
@@ -57,15 +63,109 @@ VALID_NUMBERS = {
     "nine": "9",
 }
 
+# Lookup table of the bytes that are ASCII digits.
+DIGIT_BYTES = np.zeros(256, dtype=bool)
+DIGIT_BYTES[ord("0"):ord("9") + 1] = True
+
+
+def calibration_value(line: str) -> int:
+    """Return the calibration value of a line, made of its first and last digit."""
+    first_num = next(c for c in line if c.isdigit())
+    last_num = next(c for c in reversed(line) if c.isdigit())
+    return int(first_num + last_num)
+
+
+class DigitScanner:
+    """Find the first and the last digit of a line, written as a digit or spelled out as a word.
+
+    The words (digits included, as words of one character) are compiled into two Aho-Corasick automata:
+    one over the words to scan lines forwards, one over the reversed words to scan them backwards.
+    Each scan reads every character once, with a single dict lookup, and never slices the line.
+
+    Any vocabulary works, e.g. the number words of another language: `DigitScanner({"un": "1", ...})`.
+    """
+
+    def __init__(self, words: dict[str, str] = VALID_NUMBERS):
+        words = {**{str(digit): str(digit) for digit in range(10)}, **words}
+        self.max_length = max(len(word) for word in words)
+        self.forward = self.build_automaton(words)
+        self.backward = self.build_automaton({word[::-1]: value for word, value in words.items()})
+
+    @staticmethod
+    def build_automaton(words: dict[str, str]) -> tuple[list[dict[str, int]], list[list[tuple[int, str]]]]:
+        """Return the transitions of every state, with the failures already followed, and the words ending in it."""
+        children = [{}]
+        outputs = [[]]
+        for word, value in words.items():
+            state = 0
+            for char in word:
+                if char not in children[state]:
+                    children.append({})
+                    outputs.append([])
+                    children[state][char] = len(children) - 1
+                state = children[state][char]
+            outputs[state].append((len(word), value))
+
+        # Breadth first, so that the failure state of a state, which is shallower, is always done before it.
+        failures = [0] * len(children)
+        transitions = [{}] * len(children)
+        transitions[0] = dict(children[0])
+        queue = deque(children[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] = outputs[state] + outputs[failures[state]]
+            # Characters without an edge of their own go wherever the failure state would go.
+            transitions[state] = {**transitions[failures[state]], **children[state]}
+            for char, child in children[state].items():
+                failures[child] = transitions[failures[state]].get(char, 0) if state else 0
+                queue.append(child)
+
+        return transitions, outputs
+
+    def first(self, line: str) -> str | None:
+        """Return the value of the word that starts first in the line."""
+        transitions, outputs = self.forward
+        state = 0
+        best_start, best_value = len(line), None
+        for index, char in enumerate(line):
+            # A word ending from here on can't start before the best one, once they are out of reach.
+            if index - self.max_length >= best_start:
+                break
+            state = transitions[state].get(char, 0)
+            for length, value in outputs[state]:
+                if index - length + 1 < best_start:
+                    best_start, best_value = index - length + 1, value
+        return best_value
+
+    def last(self, line: str) -> str | None:
+        """Return the value of the word that ends last in the line."""
+        transitions, outputs = self.backward
+        state = 0
+        best_end, best_value = -1, None
+        for index in range(len(line) - 1, -1, -1):
+            if index + self.max_length <= best_end:
+                break
+            state = transitions[state].get(line[index], 0)
+            for length, value in outputs[state]:
+                if index + length - 1 > best_end:
+                    best_end, best_value = index + length - 1, value
+        return best_value
+
+
+DIGIT_SCANNER = DigitScanner()
+
+
+def calibration_value_with_words(line: str, scanner: DigitScanner = DIGIT_SCANNER) -> int:
+    """Return the calibration value of a line, counting spelled out digits too."""
+    return int(scanner.first(line) + scanner.last(line))
+
 
 def solve_part_one():
     """Solve puzzle."""
     input = get_input(1)
     sum = 0
     for line in input.splitlines():
-        first_num = next(c for c in line if c.isdigit())
-        last_num = next(c for c in reversed(line) if c.isdigit())
-        sum += int(first_num + last_num)
+        sum += calibration_value(line)
 
     return sum
 
@@ -75,26 +175,64 @@ def solve_part_two():
     input = get_input(1)
     sum = 0
     for line in input.splitlines():
-        for ind, char in enumerate(line):
-            if char.isdigit():
-                first_num = char
-                break
-            elif (first_num := next((VALID_NUMBERS[num] for num in VALID_NUMBERS if line[ind: ind + len(num)] == num), None)) is not None:
-                break
-        
-        for ind in range(-1, -len(line) - 1, -1):
-            if line[ind].isdigit():
-                last_num = line[ind]
-                break
-            elif (last_num := next((VALID_NUMBERS[num] for num in VALID_NUMBERS if line[ind: ind - len(num): -1][::-1] == num), None)) is not None:
-                break
-
-        sum += int(first_num + last_num)
+        sum += calibration_value_with_words(line)
 
     return sum
 
 
+def calibration_sum(buffer: bytes | memoryview) -> int:
+    """Return the sum of the calibration values of part one, computed on the raw bytes with NumPy.
+
+    The digits are classified with a lookup table and assigned to their line with a binary search over
+    the offsets of the newlines. The first digit of a line is then the one whose line differs from the
+    digit before it, the last one the digit whose line differs from the digit after it.
+    Lines without any digit are skipped.
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    positions = np.flatnonzero(DIGIT_BYTES[data])
+    if not len(positions):
+        return 0
+
+    lines = np.searchsorted(np.flatnonzero(data == ord("\n")), positions)
+    line_changes = lines[1:] != lines[:-1]
+    firsts = data[positions[np.concatenate(([True], line_changes))]].astype(np.int64) - ord("0")
+    lasts = data[positions[np.concatenate((line_changes, [True]))]].astype(np.int64) - ord("0")
+    return int((firsts * 10 + lasts).sum())
+
+
+def solve_part_one_vectorized():
+    """Solve puzzle, on the memory-mapped input instead of line by line."""
+    with get_input(1, mapped=True) as data:
+        return calibration_sum(data.buffer)
+
+
+def chunk_sums(path: Path, start: int, end: int) -> tuple[int, int]:
+    """Return the sums of both parts over the lines in a range of bytes of the input."""
+    with MappedInput(path) as data:
+        part_one = calibration_sum(data.buffer[start:end])
+        part_two = 0
+        for line in data.lines(start, end):
+            if line:
+                part_two += calibration_value_with_words(line.decode())
+    return part_one, part_two
+
+
+def solve_parallel(workers: int | None = None, chunk_size: int = 2**20) -> tuple[int, int]:
+    """Solve both parts on newline aligned chunks of the input, spread over a process pool."""
+    return sum_over_line_ranges(get_input_path(1), chunk_sums, workers, chunk_size)
+
+
+def solve_stream(lines: Iterable[str]) -> tuple[int, int]:
+    """Solve both parts, one calibration line at a time."""
+    part_one = part_two = 0
+    for line in nonblank_lines(lines):
+        part_one += calibration_value(line)
+        part_two += calibration_value_with_words(line)
+
+    return part_one, part_two
+
+
 if __name__ == "__main__":
-    print(solve_part_one())
-    print(solve_part_two())
-    
\ No newline at end of file
+    from aoc import run_day
+
+    run_day(1)
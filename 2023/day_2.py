@@ -55,7 +55,14 @@ For each game, find the minimum set of cubes that must have been present. What i
 
 """
 
-from utils import get_input
+import re
+from array import array
+from typing import Iterable, NamedTuple
+
+import numpy as np
+
+from cache import cached_parse
+from utils import nonblank_lines
 
 MAX_COUNTS = {
     "red": 12,
@@ -63,6 +70,9 @@ MAX_COUNTS = {
     "blue": 14,
 }
 
+CUBES = re.compile(r"(\d+) (red|green|blue)")
+
+
 def parse_line(line: str) -> [tuple[int, dict[str, int]]]:
     """Parse a line of input."""
 
@@ -78,37 +88,136 @@ def parse_line(line: str) -> [tuple[int, dict[str, int]]]:
 
     return game_id, matches
 
+
+# The maximum of a color that never shows up in a game, below every count so that any bag fits it.
+ABSENT = -1
+
+
+class GameTable(NamedTuple):
+    """One row per game: its ID and the most cubes of each color shown at once, as int64 columns.
+
+    A color that never shows up in a game is ABSENT there, which tells it apart from one shown as 0 cubes.
+    """
+    game_id: np.ndarray
+    max_red: np.ndarray
+    max_green: np.ndarray
+    max_blue: np.ndarray
+
+
+def parse_games(input: str) -> GameTable:
+    """Parse every game of the input straight into a table of color maxima.
+
+    A single regex pass per line finds every count and color, nothing else is kept of the draws.
+    """
+    columns = {column: array("q") for column in GameTable._fields}
+    for line in input.splitlines():
+        if not line:
+            continue
+        game, _, draws = line.partition(": ")
+        maxima = {"red": ABSENT, "green": ABSENT, "blue": ABSENT}
+        for count, color in CUBES.findall(draws):
+            maxima[color] = max(maxima[color], int(count))
+
+        columns["game_id"].append(int(game[len("Game "):]))
+        for color, count in maxima.items():
+            columns[f"max_{color}"].append(count)
+
+    return GameTable(*(np.frombuffer(column, dtype=np.int64) for column in columns.values()))
+
+
+def possible_games(games: GameTable, bag: dict[str, int] = MAX_COUNTS) -> np.ndarray:
+    """Return the mask of the games that could have been played with the given bag."""
+    return (games.max_red <= bag["red"]) & (games.max_green <= bag["green"]) & (games.max_blue <= bag["blue"])
+
+
+class DominanceIndex:
+    """Answer "which games fit in this bag" for many bags at once.
+
+    Built once from a `GameTable`: the games are binned by their color maxima, each axis compressed to the
+    distinct maxima of that color, and the bins summed up along all three axes. The bin of a bag then holds
+    the count and the sum of the IDs of every game it dominates, so any number of bags costs a binary
+    search per color and a lookup each. The table has one bin per combination of distinct maxima, which
+    stays small because cube counts do.
+    """
+
+    def __init__(self, games: GameTable):
+        self.maxima = []
+        bins = []
+        for column in (games.max_red, games.max_green, games.max_blue):
+            values, inverse = np.unique(column, return_inverse=True)
+            self.maxima.append(values)
+            # Bin 0 of every axis is left empty, for bags below the smallest maximum.
+            bins.append(inverse + 1)
+        shape = tuple(len(values) + 1 for values in self.maxima)
+
+        self.counts = np.zeros(shape, dtype=np.int64)
+        self.id_sums = np.zeros(shape, dtype=np.int64)
+        np.add.at(self.counts, tuple(bins), 1)
+        np.add.at(self.id_sums, tuple(bins), games.game_id)
+        for axis in range(3):
+            np.cumsum(self.counts, axis=axis, out=self.counts)
+            np.cumsum(self.id_sums, axis=axis, out=self.id_sums)
+
+    def query(self, red, green, blue) -> tuple[np.ndarray, np.ndarray]:
+        """Return the sum of the IDs and the number of the games possible with each bag.
+
+        The counts of cubes can be ints or arrays of the same shape, one item per bag.
+        """
+        index = tuple(
+            np.searchsorted(values, limit, side="right")
+            for values, limit in zip(self.maxima, (red, green, blue))
+        )
+        return self.id_sums[index], self.counts[index]
+
+
+def is_possible(matches: list[dict[str, int]]) -> bool:
+    """Return True if every match of a game fits in the bag of part one."""
+    return all(all(match[color] <= MAX_COUNTS[color] for color in match) for match in matches)
+
+
+def power(matches: list[dict[str, int]]) -> int:
+    """Return the product of the fewest cubes of each color the game could have been played with."""
+    max_per_color = {}
+    for match in matches:
+        for color, count in match.items():
+            max_per_color[color] = max(max_per_color.get(color, 0), count)
+
+    prod = 1
+    for color, count in max_per_color.items():
+        prod *= count
+
+    return prod
+
+
 def solve_part_one():
     """Solve puzzle."""
-    input = get_input(2)
-    sum = 0
-    for line in input.splitlines():
-        game_id, matches = parse_line(line)
-        if all(all(match[color] <= MAX_COUNTS[color] for color in match) for match in matches):
-            sum += game_id
-    return sum
+    games = cached_parse(2, parse_games)
+    return int(games.game_id[possible_games(games)].sum())
 
 
 def solve_part_two():
     """Solve puzzle."""
-    input = get_input(2)
-    sum = 0
-    for line in input.splitlines():
-        max_per_color = {}
-        matches = parse_line(line)[1]
-        for match in matches:
-            for color, count in match.items():
-                max_per_color[color] = max(max_per_color.get(color, 0), count)
+    games = cached_parse(2, parse_games)
+    # Like power(), a color that never shows up in a game is left out of its product.
+    powers = np.ones_like(games.game_id)
+    for column in (games.max_red, games.max_green, games.max_blue):
+        powers *= np.where(column != ABSENT, column, 1)
+    return int(powers.sum())
+
+
+def solve_stream(lines: Iterable[str]) -> tuple[int, int]:
+    """Solve both parts, one game at a time."""
+    part_one = part_two = 0
+    for line in nonblank_lines(lines):
+        game_id, matches = parse_line(line)
+        if is_possible(matches):
+            part_one += game_id
+        part_two += power(matches)
 
-        prod = 1
-        for color, count in max_per_color.items():
-            prod *= count
-        
-        sum += prod
-        
-    return sum
+    return part_one, part_two
 
 
 if __name__ == "__main__":
-    print(solve_part_one())
-    print(solve_part_two())
+    from aoc import run_day
+
+    run_day(2)
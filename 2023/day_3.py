@@ -64,106 +64,392 @@ What is the sum of all of the gear ratios in your engine schematic?
 
 """
 
-from calendar import c
-from collections import defaultdict
-from ipaddress import ip_address
-from typing import Dict, List, Tuple
+import re
+from bisect import bisect_left, bisect_right
+from collections import deque
+from itertools import chain
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
 
-from traitlets import default
-from utils import get_input
-from string import punctuation
-from itertools import chain, groupby
+import numpy as np
 
-SYMBOLS = set(punctuation) - set('.')
+from utils import MappedInput, get_input, get_input_path, nonblank_lines, sum_over_line_ranges
 
+# Every byte above a space that is neither a digit nor a period is a symbol. Bytes are classified with
+# arithmetic on whole arrays rather than a lookup table, which is several times faster.
+PERIOD = ord(".")
+SPACE = ord(" ")
 
-def get_grid(input):
-    return [list(line) for line in input.splitlines()]
+# The most digits a number can have and always fit in an int64.
+INT64_DIGITS = 18
 
-def check_adjacent(start: int, end: int, current_row: List[str], above_row: List[str], below_row: List[str]):
-    """Check if any of the symbols are adjacent to the numbers, including diagonally."""
+# Bytes searched at first for the end of the first line, doubled until it is found.
+FIRST_LINE_SEARCH = 4096
 
-    if not set(current_row[start:end]).isdisjoint(SYMBOLS):
-        return True
-    
-    if not set(above_row[start:end]).isdisjoint(SYMBOLS):
-        return True
-        
-    if not set(below_row[start:end]).isdisjoint(SYMBOLS):
-        return True
+# Results whose float estimate reaches this are recomputed with Python ints, they might overflow an int64.
+INT64_SAFE = 2**62
 
-    return False
 
+def digit_mask(cells: np.ndarray) -> np.ndarray:
+    """Return the mask of the digits of an array of bytes."""
+    # Bytes below "0" wrap around to large unsigned values.
+    return cells - np.uint8(ord("0")) < 10
 
-def solve_part_one_and_two():
-    input = get_input(3)
-    grid = get_grid(input)
-
-    # Cover the whole grid with a '.' border to make it easier to check for adjacent symbols
-    # without ugly index checking.
-    row_length = len(grid[0])
-    grid.insert(0, ['.'] * row_length)
-    grid.append(['.'] * row_length)
-    
-    for row in grid:
-        row.insert(0, '.')
-        row.append('.')
 
-    numbers = []
+def is_digit_byte(cell: int) -> bool:
+    return ord("0") <= cell <= ord("9")
+
+
+def is_symbol_byte(cell: int) -> bool:
+    return cell > SPACE and cell != PERIOD and not is_digit_byte(cell)
+
+
+class Schematic(NamedTuple):
+    # One row of bytes per line, the line ending included, so that numbers never run from a row into the next.
+    grid: np.ndarray
+    # The ID of the number covering each cell, -1 for the cells without digits. Same shape as the grid.
+    labels: np.ndarray
+    # The value of each number and whether it is a part number, indexed by ID.
+    values: np.ndarray
+    is_part: np.ndarray
+
+
+def dilate(mask: np.ndarray) -> np.ndarray:
+    """Return the mask of the cells that are in, or next to (even diagonally), a cell of the 2D mask."""
+    # A 3x3 kernel is a 3x1 kernel followed by a 1x3 kernel.
+    rows = mask.copy()
+    rows[1:] |= mask[:-1]
+    rows[:-1] |= mask[1:]
+    dilated = rows.copy()
+    dilated[:, 1:] |= rows[:, :-1]
+    dilated[:, :-1] |= rows[:, 1:]
+    return dilated
+
+
+def exact_sum(values: np.ndarray) -> int:
+    """Return the sum of an array of ints, with Python ints if it might overflow an int64."""
+    if values.dtype != object and abs(values.sum(dtype=np.float64)) >= INT64_SAFE:
+        values = values.astype(object)
+    return int(values.sum())
+
 
-    # Store the positions of the numbers per row so that we can use that in second part
-    # We will be storing the number, start and end index of the number in the row.
-    # This will helps us know that if the number is adjacent to a star or not.
-    number_positions = defaultdict(list)
-
-    for ind, row in enumerate(grid[1:-1], start=1):
-        col_index = 1
-        for k, g in groupby(row[1:-1], key=str.isdigit):
-            item = "".join(g)
-            if k:
-                if check_adjacent(start=col_index - 1, end=col_index + len(item) + 1, current_row=row, above_row=grid[ind-1], below_row=grid[ind + 1]):
-                    numbers.append(int(item))
-                    number_positions[ind].append((int(item), col_index, col_index + len(item) - 1))
-            col_index += len(item)
-
-    print(sum(numbers))
-
-    # Part two
-    total = 0
-    for ind, row in enumerate(grid[1:-1], start=1):
-        col_index = 1
-        for k, g in groupby(row[1:-1], key=lambda x: x == "*"):
-            if k:
-                total += find_product_of_adjacent_numbers_to_a_star(grid=grid, number_positions=number_positions, star_index=col_index, current_row_index=ind, above_row_index=ind-1, below_row_index=ind+1)
-                col_index += 1
-            else:
-                col_index += sum(1 for _ in g)
-
-    print(total)
-
-
-def find_product_of_adjacent_numbers_to_a_star(grid: List[List[str]], number_positions: Dict[int, List[Tuple[int, int, int]]], star_index: int, current_row_index: int, above_row_index: int, below_row_index: int):
-    """Find the product of the adjacent numbers to a star.
-    
-    We need to check the numbers above, below and on the same row as the star.
+def first_line(data: bytes | memoryview) -> bytes:
+    """Return the first line of a buffer, line ending included, without copying much more than that."""
+    size = FIRST_LINE_SEARCH
+    while True:
+        head = bytes(data[:size])
+        newline = head.find(b"\n")
+        if newline != -1 or size >= len(data):
+            return head[:newline + 1] if newline != -1 else head
+        size *= 2
+
+
+def parse_schematic(input: str | bytes | memoryview) -> Schematic:
+    """Label the runs of digits of the schematic and find which ones touch a symbol.
+
+    Everything is done on whole arrays, the only Python loop is over the places of the longest number.
+    A buffer, e.g. of a `MappedInput`, is used in place: the grid is a view of it, not a copy.
+    Trailing blank lines are left out, like `solve_stream` does:
+
+    >>> parse_schematic("467..\\n...*.\\n..35.\\n\\n").values
+    array([467,  35])
+    """
+    data = input.encode() if isinstance(input, str) else input
+    first = first_line(data)
+    ending = b"\r\n" if first.endswith(b"\r\n") else b"\n"
+    width = len(first.rstrip(b"\r\n")) + len(ending)
+
+    # Trailing blank lines are left out, and the last line gets the same line ending as the others, so
+    # that all rows are as wide.
+    end = len(data)
+    while end and data[end - 1] in b"\r\n":
+        end -= 1
+    data = data[:end + len(ending)] if bytes(data[end:end + len(ending)]) == ending else bytes(data[:end]) + ending
+    if len(data) % width:
+        raise ValueError("The lines of the schematic are not all as wide")
+    grid = np.frombuffer(data, dtype=np.uint8).reshape(-1, width)
+    cells = grid.ravel()
+
+    # A number runs from a digit after a non-digit to a digit before one. Every row ends with its line
+    # ending, so a number never runs from a row into the next.
+    is_digit = digit_mask(cells)
+    starts_number = is_digit.copy()
+    starts_number[1:] &= ~is_digit[:-1]
+    ends_number = is_digit.copy()
+    ends_number[:-1] &= ~is_digit[1:]
+    starts = np.flatnonzero(starts_number)
+    ends = np.flatnonzero(ends_number)
+
+    is_symbol = cells > SPACE
+    is_symbol &= cells != PERIOD
+    is_symbol &= ~is_digit
+    near_symbol = dilate(is_symbol.reshape(grid.shape)).ravel()
+
+    # The first place of every number, then one place at a time of the numbers that are still going. Most
+    # numbers are short, so those quickly run out.
+    lengths = ends - starts + 1
+    labels = np.full(cells.size, -1, dtype=np.int32)
+    labels[starts] = np.arange(len(starts), dtype=np.int32)
+    is_part = near_symbol[starts]
+    values = cells[starts] - np.uint8(ord("0"))
+    # A number too long for an int64 makes them all Python ints, which the sums and products further on
+    # work with just as well.
+    values = values.astype(object if len(starts) and lengths.max() > INT64_DIGITS else np.int64)
+    numbers = np.flatnonzero(lengths > 1)
+    place = 1
+    while len(numbers):
+        positions = starts[numbers] + place
+        labels[positions] = numbers
+        is_part[numbers] |= near_symbol[positions]
+        values[numbers] = values[numbers] * 10 + (cells[positions] - np.uint8(ord("0"))).astype(values.dtype)
+        place += 1
+        numbers = numbers[lengths[numbers] > place]
+
+    return Schematic(grid, labels.reshape(grid.shape), values, is_part)
+
+
+def adjacent_numbers(schematic: Schematic, symbol: str, rows: slice = slice(None)) -> np.ndarray:
+    """Return the IDs of the numbers next to every occurrence of a symbol in the given rows, in reading order.
+
+    One row of 8 per symbol: each ID once, in no particular order, and -1 for the rest of the row.
     """
+    labels = schematic.labels.ravel()
+    height, width = schematic.grid.shape
+    first_row = rows.indices(height)[0]
+    positions = np.flatnonzero(schematic.grid[rows].ravel() == ord(symbol)) + first_row * width
+
+    # The neighbours to the left and right of the edge columns are line endings, only rows can run out.
+    neighbours = positions[:, None] + np.array([-width - 1, -width, -width + 1, -1, 1, width - 1, width, width + 1])
+    ids = labels[np.clip(neighbours, 0, labels.size - 1)]
+    if len(positions) and (positions[0] < width or positions[-1] >= labels.size - width):
+        ids[(neighbours < 0) | (neighbours >= labels.size)] = -1
+
+    # A number lies within a row, so it can only show up again in the next neighbour of the row above or
+    # below. Keep the first of them.
+    for side in ids[:, :3], ids[:, 5:]:
+        side[:, 1:][side[:, 1:] == side[:, :-1]] = -1
+    return ids
+
+
+def combine_adjacent_numbers(
+    schematic: Schematic, symbol: str, count: int, combine: np.ufunc = np.multiply, rows: slice = slice(None)
+) -> np.ndarray:
+    """Combine the numbers around every occurrence of `symbol` that is next to exactly `count` of them.
+
+    `combine` is a ufunc with an identity, np.multiply for gear ratios or np.add for sums. Returns one
+    result per matching symbol of the given rows, in reading order.
+    """
+    ids = adjacent_numbers(schematic, symbol, rows)
+    present = ids >= 0
+    matching = np.count_nonzero(present, axis=1) == count
+    ids, present = ids[matching], present[matching]
+    if not len(schematic.values):
+        # Nothing to look up: only a count of 0 matches any symbol, and those combine no numbers.
+        return np.full(len(ids), combine.identity, dtype=np.int64)
+    operands = np.where(present, schematic.values[ids], combine.identity)
+    if operands.dtype != object and len(operands) and np.abs(combine.reduce(operands.astype(np.float64), axis=1)).max() >= INT64_SAFE:
+        operands = operands.astype(object)
+    return combine.reduce(operands, axis=1)
+
+
+def gear_ratios(schematic: Schematic, rows: slice = slice(None)) -> np.ndarray:
+    """Return the gear ratio of every `*` of the given rows that is next to exactly two numbers."""
+    return combine_adjacent_numbers(schematic, "*", 2, np.multiply, rows)
+
+
+def solve_part_one_and_two():
+    with get_input(3, mapped=True) as data:
+        schematic = parse_schematic(data.buffer)
+    part_one = exact_sum(schematic.values[schematic.is_part])
+    total = exact_sum(gear_ratios(schematic))
+
+    return part_one, total
+
+
+def band_sums(path: Path, start: int, end: int) -> tuple[int, int]:
+    """Return the sums of both parts over the numbers and gears of a band of rows of the input."""
+    with MappedInput(path) as data:
+        # Every row is as wide as the first one, line ending included, so a halo row is `width` bytes.
+        # One on either side, to see the symbols and numbers next to the edge rows of the band.
+        # A file of a single line without a line ending is a single row.
+        width = data.find(b"\n") + 1 or len(data.buffer) + 1
+        halo_start = max(start - width, 0)
+        halo_end = min(end + width, len(data.buffer))
+        schematic = parse_schematic(data.buffer[halo_start:halo_end])
+
+    # Only the numbers and gears of its own rows count towards a band, the halo rows belong to the neighbours.
+    # Rows are counted from the bytes rather than the end of the grid, which leaves out trailing blank lines.
+    # The last row is short of its line ending when the file doesn't end with one.
+    rows = slice((start - halo_start) // width, -(-(end - halo_start) // width))
+    owned = np.zeros(len(schematic.values), dtype=bool)
+    labels = schematic.labels[rows]
+    owned[labels[labels >= 0]] = True
+
+    part_one = exact_sum(schematic.values[owned & schematic.is_part])
+    part_two = exact_sum(gear_ratios(schematic, rows))
+    return part_one, part_two
+
+
+def solve_parallel(workers: int | None = None, band_size: int = 2**20) -> tuple[int, int]:
+    """Solve both parts on bands of rows of the input, spread over a process pool."""
+    return sum_over_line_ranges(get_input_path(3), band_sums, workers, band_size)
+
+
+NUMBER = re.compile(r"\d+")
+SYMBOL = re.compile(r"[^\d.\s]")
+
 
-    # 467.114..
-    # ...*......
-    # ..35..633.
-    # Imagine a case like above, here 467, 114 and 35 all are adjacent to the star.
-    numbers_above_row = [(number, start, end) for number, start, end in number_positions[above_row_index] if start - 1 <= star_index <= end + 1]
-    numbers_below_row = [(number, start, end) for number, start, end in number_positions[below_row_index] if start - 1 <= star_index <= end + 1]
+class Row(NamedTuple):
+    """The numbers and symbols of one line of the schematic, each sorted by column."""
+    starts: list[int]
+    ends: list[int]
+    values: list[int]
+    symbols: list[int]
+    stars: list[int]
 
-    # If the adjacent numbers are on the same row as the stars then we need to check slightly differently: 617*123...
-    numbers_current_row = [(number, start, end) for number, start, end in number_positions[current_row_index] if (start - 1 == star_index) or (end + 1 == star_index)]
 
-    numbers = numbers_above_row + numbers_below_row + numbers_current_row
+EMPTY_ROW = Row([], [], [], [], [])
+
+
+def parse_row(line: str) -> Row:
+    numbers = [(match.start(), match.end() - 1, int(match.group())) for match in NUMBER.finditer(line)]
+    symbols = [match.start() for match in SYMBOL.finditer(line)]
+    starts, ends, values = map(list, zip(*numbers)) if numbers else ([], [], [])
+    return Row(starts, ends, values, symbols, [col for col in symbols if line[col] == "*"])
+
+
+def has_symbol_between(row: Row, low: int, high: int) -> bool:
+    index = bisect_left(row.symbols, low)
+    return index < len(row.symbols) and row.symbols[index] <= high
+
+
+def numbers_around(row: Row, col: int) -> list[int]:
+    """Return the numbers of a row that reach the column, or the columns right next to it."""
+    numbers = []
+    index = bisect_right(row.starts, col + 1)
+    while index and row.ends[index - 1] >= col - 1:
+        index -= 1
+        numbers.append(row.values[index])
+    return numbers
+
+
+def score_row(above: Row, row: Row, below: Row) -> tuple[int, int]:
+    """Return the sum of the part numbers and of the gear ratios of the middle one of three rows."""
+    window = (above, row, below)
+    part_numbers = sum(
+        value
+        for start, end, value in zip(row.starts, row.ends, row.values)
+        if any(has_symbol_between(other, start - 1, end + 1) for other in window)
+    )
+
+    gear_ratios = 0
+    for col in row.stars:
+        numbers = [number for other in window for number in numbers_around(other, col)]
+        if len(numbers) == 2:
+            gear_ratios += numbers[0] * numbers[1]
+
+    return part_numbers, gear_ratios
+
+
+def solve_stream(lines: Iterable[str]) -> tuple[int, int]:
+    """Solve both parts, scoring each row as soon as the one below it comes in."""
+    # Adjacency never reaches further than a row up or down, so only the last three rows are held.
+    part_one = part_two = 0
+    rows = map(parse_row, nonblank_lines(lines))
+    window = deque([EMPTY_ROW], maxlen=3)
+    for row in chain(rows, [EMPTY_ROW]):
+        window.append(row)
+        if len(window) == 3:
+            part_numbers, gear_ratios = score_row(*window)
+            part_one += part_numbers
+            part_two += gear_ratios
+
+    return part_one, part_two
+
+
+class EditableSchematic:
+    """A schematic that keeps both answers up to date while its cells are edited.
+
+    A cell can only change the part numbers of the numbers in its 3x3 neighbourhood and the gears next to
+    those numbers or on the cell itself. `update` scores just those before and after the edit and applies
+    the difference to the totals, so its cost depends on the length of the numbers, not the size of the grid.
+    """
+
+    def __init__(self, input: str):
+        self.rows = [bytearray(line.encode()) for line in input.splitlines() if line]
+        schematic = parse_schematic(input)
+        self.part_one = exact_sum(schematic.values[schematic.is_part])
+        self.part_two = exact_sum(gear_ratios(schematic))
+
+    def update(self, row: int, col: int, char: str) -> tuple[int, int]:
+        """Set a cell and return the new answers."""
+        if len(char) != 1 or not char.isprintable() or char.isspace():
+            raise ValueError(f"Not a schematic cell: {char!r}")
+        cells = self.rows[row]
+        old, new = cells[col], ord(char)
+
+        numbers_before = self._numbers_around(row, col)
+        cells[col] = new
+        numbers_after = self._numbers_around(row, col)
+        stars = {(row, col)} | self._stars_around(numbers_before | numbers_after)
+        parts_after, gears_after = self._score(numbers_after, stars)
+        cells[col] = old
+        parts_before, gears_before = self._score(numbers_before, stars)
+        cells[col] = new
+
+        self.part_one += parts_after - parts_before
+        self.part_two += gears_after - gears_before
+        return self.part_one, self.part_two
+
+    def _neighbours(self, row: int, start: int, end: int) -> Iterator[tuple[int, int]]:
+        """Yield the cells in and around a span of a row that are inside the grid."""
+        for other in range(max(row - 1, 0), min(row + 2, len(self.rows))):
+            for col in range(max(start - 1, 0), min(end + 2, len(self.rows[other]))):
+                yield other, col
+
+    def _numbers_around(self, row: int, col: int) -> set[tuple[int, int, int]]:
+        """Return the numbers in the 3x3 neighbourhood of a cell, as (row, start, end) spans."""
+        numbers = set()
+        for other, start in self._neighbours(row, col, col):
+            cells = self.rows[other]
+            if not is_digit_byte(cells[start]):
+                continue
+            end = start
+            while start and is_digit_byte(cells[start - 1]):
+                start -= 1
+            while end + 1 < len(cells) and is_digit_byte(cells[end + 1]):
+                end += 1
+            numbers.add((other, start, end))
+        return numbers
+
+    def _stars_around(self, numbers: set[tuple[int, int, int]]) -> set[tuple[int, int]]:
+        return {
+            (other, col)
+            for row, start, end in numbers
+            for other, col in self._neighbours(row, start, end)
+            if self.rows[other][col] == ord("*")
+        }
+
+    def _score(self, numbers: set[tuple[int, int, int]], stars: set[tuple[int, int]]) -> tuple[int, int]:
+        """Return the sum of the given numbers that are part numbers and of the ratios of the given gears."""
+        part_numbers = sum(
+            int(self.rows[row][start:end + 1])
+            for row, start, end in numbers
+            if any(is_symbol_byte(self.rows[other][col]) for other, col in self._neighbours(row, start, end))
+        )
+
+        gear_ratios = 0
+        for row, col in stars:
+            if self.rows[row][col] != ord("*"):
+                continue
+            around = [int(self.rows[other][start:end + 1]) for other, start, end in self._numbers_around(row, col)]
+            if len(around) == 2:
+                gear_ratios += around[0] * around[1]
+
+        return part_numbers, gear_ratios
 
-    if len(numbers) == 2:
-        return numbers[0][0] * numbers[1][0]
-    
-    return 0
 
 if __name__ == "__main__":
-    solve_part_one_and_two()
+    from aoc import run_day
+
+    run_day(3)
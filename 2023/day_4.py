@@ -72,38 +72,106 @@ Process all of the original and copied scratchcards until no more scratchcards a
 """
 from calendar import c
 import re
-from typing import Counter
-from utils import get_input
+from collections import deque
+from typing import Iterable
+
+from utils import nonblank_lines
+
+def to_mask(numbers):
+    """Return the numbers as an int with the bit of each number set."""
+    mask = 0
+    for n in numbers.split():
+        mask |= 1 << int(n)
+    return mask
+
 
 def parse_card(line):
     winning, yours = re.split(r'Card\s+\d+: ', line)[1].split(' | ')
-    winning = set(int(n) for n in winning.split())
-    yours = set(int(n) for n in yours.split())
-    return winning, yours
+    return to_mask(winning), to_mask(yours)
+
+
+def parse_input(input):
+    return [parse_card(line) for line in input.splitlines()]
+
+
+def count_matches(winning, yours):
+    return (winning & yours).bit_count()
 
 
 def solve_part_one(cards):
     total = 0
     for winning, yours in cards:
-        count = len(yours.intersection(winning))
+        count = count_matches(winning, yours)
         if count:
             total += 2 ** (count - 1)
     return total
 
 
+class CopyPropagator:
+    """Count the copies of the cards as they come in, from the number of matches of each card.
+
+    A card with k matches adds its count to each of the next k cards. Instead of k additions, it adds the
+    count to a difference array where that range starts and takes it away where the range ends; the
+    running sum of the differences is the number of copies won for the current card. Only the differences
+    of the next few cards are live, so they are kept in a deque no longer than the most matches plus one.
+    """
+
+    def __init__(self):
+        self.pending = deque()
+        self.copies = 0
+        self.total = 0
+
+    def add(self, matches):
+        """Take the next card and return how many of it there are, the original included."""
+        self.copies += self.pending.popleft() if self.pending else 0
+        count = 1 + self.copies
+        if matches:
+            self.pending.extend([0] * (matches + 1 - len(self.pending)))
+            self.pending[0] += count
+            self.pending[matches] -= count
+        self.total += count
+        return count
+
+
 def solve_part_two(cards):
-    counter = Counter()
-    for index, (winning, yours) in enumerate(cards, start=1):
-        count = len(yours.intersection(winning))
-        # Increment original card count
-        counter[index] += 1
+    propagator = CopyPropagator()
+    for winning, yours in cards:
+        propagator.add(count_matches(winning, yours))
+
+    return propagator.total
+
+
+class ScratchcardTally:
+    """Running answers of both parts, updated one card at a time.
+
+    Copies are only ever won for the next few cards, so the tally holds the points so far and the
+    copies still pending, see `CopyPropagator`.
+    """
+
+    def __init__(self):
+        self.points = 0
+        self.copies = CopyPropagator()
+
+    def add(self, line):
+        count = count_matches(*parse_card(line))
         if count:
-            for i in range(1, count + 1):
-                counter[index + i] += counter[index]
+            self.points += 2 ** (count - 1)
+        self.copies.add(count)
+
+    def answers(self):
+        return self.points, self.copies.total
+
+
+def solve_stream(lines: Iterable[str]) -> tuple[int, int]:
+    """Solve both parts, one card at a time."""
+    tally = ScratchcardTally()
+    for line in nonblank_lines(lines):
+        tally.add(line)
+
+    return tally.answers()
+
 
-    return sum(counter.values())
+if __name__ == "__main__":
+    from aoc import run_day
 
-if __name__ == '__main__':
-    cards = [parse_card(line) for line in get_input(4).splitlines()]
-    print(solve_part_one(cards))
-    print(solve_part_two(cards))
+    run_day(4)
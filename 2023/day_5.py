@@ -103,16 +103,18 @@ So, the lowest location number in this example is 35.
 What is the lowest location number that corresponds to any of the initial seed numbers?
 """
 
+from bisect import bisect_left, bisect_right
 from calendar import c
-from io import TextIOWrapper
+from functools import reduce
 from itertools import groupby
 from operator import ge
-from typing import Dict, Iterable, List, Tuple, NamedTuple
+from typing import Dict, Iterable, Iterator, List, Tuple, NamedTuple
 
-from utils import get_input
+import numpy as np
 
-_print = print
-print = lambda *args, **kwargs: None
+from tracing import TRACE, get_logger
+
+log = get_logger(5)
 
 
 class XtoYMapInfo(NamedTuple):
@@ -123,7 +125,7 @@ class XtoYMapInfo(NamedTuple):
 
 def parse_map(lines: Iterable[str]) -> Dict[int, int]:
     """Parse lines of input containing maps"""
-    # print(f"Processing map: {lines[0]}")
+    log.debug("Processing map: %s", lines[0])
     ranges = []
 
     for line in lines[1:]:
@@ -132,133 +134,185 @@ def parse_map(lines: Iterable[str]) -> Dict[int, int]:
 
     return ranges
 
-_T = (XtoYMapInfo, XtoYMapInfo, XtoYMapInfo, XtoYMapInfo, XtoYMapInfo, XtoYMapInfo, XtoYMapInfo)
+Almanac = Tuple[List[int], "PiecewiseShift"]
+
 
-def parse_input_part_one(input_file: TextIOWrapper) -> Tuple[List[int], *_T]:
-    """Parse lines of input into maps"""
-    seeds = [int(x) for x in next(input_file).split(": ")[1].split()]
-    next(input_file)
+def parse_input(input: str) -> Almanac:
+    """Parse the numbers of the seeds line and fold the maps into the function from seeds to locations.
+
+    Both parts go through the same maps and only differ in how they read the seeds line, so the maps are
+    composed once per almanac, cached along with the parse, and each part picks its seeds from the numbers.
+    """
+    seeds, *groups = input.split("\n\n")
+    numbers = [int(x) for x in seeds.split(": ")[1].split()]
 
     ranges = []
-    for group in input_file.read().split("\n\n"):
+    for group in groups:
         lines = group.splitlines()
-        ranges.append(parse_map(lines))
+        if lines:
+            ranges.append(parse_map(lines))
 
-    return seeds, *ranges
+    return numbers, compose_maps(ranges)
 
 
-def parse_input_part_two(input_file: TextIOWrapper) -> Tuple[List[int], *_T]:
-    numbers = [int(x) for x in next(input_file).split(": ")[1].split()]
-    starts, ranges = numbers[::2], numbers[1::2]
+def parse_input_part_two(almanac: Almanac) -> Tuple[List[Tuple[int, int]], "PiecewiseShift"]:
+    """Read the seeds line as pairs of start and length"""
+    numbers, seed_to_location = almanac
+    starts, lengths = numbers[::2], numbers[1::2]
     seed_ranges = []
-    for start, _range in zip(starts, ranges):
+    for start, _range in zip(starts, lengths):
         seed_ranges.append((start, start + _range))
 
-    next(input_file)
-    ranges = []
-    for group in input_file.read().split("\n\n"):
-        lines = group.splitlines()
-        ranges.append(parse_map(lines))
+    return seed_ranges, seed_to_location
 
-    return seed_ranges, *ranges
 
+class PiecewiseShift(NamedTuple):
+    """A function on the non-negative ints that adds a constant over each of a sorted list of intervals.
 
-def solve_part_one(lines: Iterable[str]) -> int:
-    """Solve part one"""
-    seeds, *ranges = parse_input_part_one (lines)
-    min_distance = float("inf")
-
-    for seed in seeds:
-        key = seed
-        for _ranges in ranges:
-            for _range in _ranges:
-                if _range.source_start <= key < _range.source_start + _range.range:
-                    key = _range.destination_start + (key - _range.source_start)
+    Interval i runs from starts[i] up to starts[i + 1], the last one has no end, and adds offsets[i].
+    starts[0] is always 0. Plain lists of ints, so it pickles and can go through `cached_parse`.
+    """
+    starts: List[int]
+    offsets: List[int]
+
+    @classmethod
+    def from_map(cls, entries: List[XtoYMapInfo]) -> "PiecewiseShift":
+        """Return the function of a map: the numbers outside of every entry are left as they are."""
+        starts, offsets = [0], [0]
+        for entry in sorted(entries, key=lambda entry: entry.source_start):
+            if starts[-1] == entry.source_start:
+                offsets[-1] = entry.destination_start - entry.source_start
+            else:
+                starts.append(entry.source_start)
+                offsets.append(entry.destination_start - entry.source_start)
+            starts.append(entry.source_start + entry.range)
+            offsets.append(0)
+        return cls.merged(starts, offsets)
+
+    @classmethod
+    def merged(cls, starts: List[int], offsets: List[int]) -> "PiecewiseShift":
+        """Drop the intervals that add the same as the one before them."""
+        merged = cls([starts[0]], [offsets[0]])
+        for start, offset in zip(starts[1:], offsets[1:]):
+            if offset != merged.offsets[-1]:
+                merged.starts.append(start)
+                merged.offsets.append(offset)
+        return merged
+
+    def apply(self, numbers: np.ndarray) -> np.ndarray:
+        """Return the function of a whole array of numbers: one searchsorted and one add, no Python loop."""
+        intervals = np.searchsorted(np.asarray(self.starts, dtype=np.int64), numbers, side="right") - 1
+        return numbers + np.asarray(self.offsets, dtype=np.int64)[intervals]
+
+    def then(self, other: "PiecewiseShift") -> "PiecewiseShift":
+        """Return the function that applies this one, then `other`.
+
+        Each interval of this function is shifted, then split where it crosses the intervals of `other`.
+        """
+        starts, offsets = [], []
+        for index, (start, offset) in enumerate(zip(self.starts, self.offsets)):
+            end = self.starts[index + 1] if index + 1 < len(self.starts) else None
+            other_index = bisect_right(other.starts, start + offset) - 1
+            while True:
+                starts.append(max(start, other.starts[other_index] - offset))
+                offsets.append(offset + other.offsets[other_index])
+                other_index += 1
+                if other_index == len(other.starts) or (end is not None and other.starts[other_index] - offset >= end):
                     break
-        
-        min_distance = min(min_distance, key)
-    
-    return min_distance
+        return self.merged(starts, offsets)
+
+
+class IntervalSet:
+    """A set of ints, kept as sorted, disjoint half-open intervals.
+
+    Intervals that overlap or touch are merged as they are added, so a set never holds more intervals
+    than it needs to.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[int, int]] = ()):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for start, end in intervals:
+            self.add(start, end)
+
+    def add(self, start: int, end: int) -> None:
+        """Add the numbers from `start` up to `end`, merging the intervals they overlap or touch."""
+        if start >= end:
+            return
+        first = bisect_left(self.ends, start)
+        last = bisect_right(self.starts, end)
+        if first < last:
+            start = min(start, self.starts[first])
+            end = max(end, self.ends[last - 1])
+        self.starts[first:last] = [start]
+        self.ends[first:last] = [end]
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.starts, self.ends)
+
+    def __len__(self) -> int:
+        return len(self.starts)
 
+    def min(self) -> int:
+        if not self.starts:
+            raise ValueError("min() of an empty IntervalSet")
+        return self.starts[0]
 
-def solve_part_two(lines: Iterable[str]) -> int:
+    def image(self, shift: PiecewiseShift) -> "IntervalSet":
+        """Return the set of the values the shift takes on this set.
+
+        Both are sorted, so the intervals are split at the boundaries of the shift in a single sweep.
+        """
+        pieces = []
+        index = 0
+        for start, end in self:
+            while index + 1 < len(shift.starts) and shift.starts[index + 1] <= start:
+                index += 1
+            while start < end:
+                piece_end = min(end, shift.starts[index + 1]) if index + 1 < len(shift.starts) else end
+                pieces.append((start + shift.offsets[index], piece_end + shift.offsets[index]))
+                start = piece_end
+                if start < end:
+                    index += 1
+
+        # The shifts take the pieces out of order, sorted they are added at the end of the set.
+        return IntervalSet(sorted(pieces))
+
+
+IDENTITY = PiecewiseShift([0], [0])
+
+
+def compose_maps(maps: List[List[XtoYMapInfo]]) -> PiecewiseShift:
+    """Fold the maps, in order, into a single function from seeds to locations."""
+    composed = reduce(PiecewiseShift.then, map(PiecewiseShift.from_map, maps), IDENTITY)
+    log.debug("Composed %s maps into %s intervals", len(maps), len(composed.starts))
+    return composed
+
+
+def solve_part_one(almanac: Almanac) -> int:
+    """Solve part one"""
+    seeds, seed_to_location = almanac
+    return int(seed_to_location.apply(np.array(seeds, dtype=np.int64)).min())
+
+
+def solve_part_two(almanac: Almanac) -> int:
     """Solve part two"""
-    seed_ranges, *ranges = parse_input_part_two(lines)
-
-    # This ones' a doozy!!
-    # Give the input is in millions and billions in terms of range in part 2,
-    # the brute-force solution will take a long time. Probably not so long with PyPy :-)
-
-    # A great explanation of the solution can be found here: https://youtu.be/NmxHw_bHhGM?si=1BL08HGMD1OWvTiR
-
-    # This is my implementation and explanation based on the excellent video above
-
-    # The way to understand this is:
-    # For every range we try to break down the seed range into further ranges.
-    # seed-to-soil map(or map-ranges) will give us the initial breakdown of the seed ranges. This new breakdown maps to the destination range
-    # provided in the map.
-    # The new seed ranges are then further broken down by the soil-to-fertilizer map and so on.
-    # Eventually we'll end up with a seed range that maps to a location range and the minimum of that location range is the answer.
-
-    # How the seed range breakdown happens for every map-range is as follows:
-    # 1. The part before the overlap(from seed start)
-    # 2. The part that overlaps (this is the part we're interested in and is mapped to the destination range)
-    # 3. The part after the overlap(till seed end)
-
-    # The part that overlaps includes the range from the destinations start to the destinations start + the range of the map-range
-    # as that's because that's where we actually have a match
-    # The part before(1) and after the overlap(3) are the parts that don't match YET, but they might match with another map-range
-
-    # https://i.imgur.com/9Dhssos.jpg
-
-    for _ranges in ranges:
-        new_seed_ranges = []
-        while len(seed_ranges) > 0:
-            seed_start, seed_end = seed_ranges.pop(0)
-
-            for _range in _ranges:
-                print(_range)
-                _range_destination_start, _range_source_start, _range_range = _range
-                overlap_start = max(seed_start, _range_source_start)
-                overlap_end = min(seed_end, _range_source_start + _range_range)
-
-                print(
-                    f"Seed range: {seed_start} - {seed_end}, "
-                    f"Map range: {_range_source_start} - {_range_source_start + _range_range}, "
-                    f"Overlap: {overlap_start} - {overlap_end}",
-                    end=" --> "
-                )
-
-                if overlap_start < overlap_end:
-                    new_seed_ranges.append((overlap_start - _range_source_start + _range_destination_start, overlap_end - _range_source_start + _range_destination_start))
-                    if overlap_start > seed_start:
-                        new_seed_ranges.append((seed_start, overlap_start))
-                    if overlap_end < seed_end:
-                        new_seed_ranges.append((overlap_end, seed_end))
-                    
-                    print("Overlap")
-                    break
-                else:
-                    print("No overlap in this range")
+    seed_ranges, seed_to_location = parse_input_part_two(almanac)
 
-            else:
-                print("No overlap in any range")
-                new_seed_ranges.append((seed_start, seed_end))
+    # The seed ranges go through the composed function in one sweep: each range is split where it crosses
+    # an interval of the function and the shifted pieces are merged back together where they touch.
+    seeds = IntervalSet(seed_ranges)
+    locations = seeds.image(seed_to_location)
 
-            print("New seed ranges", new_seed_ranges)
-            print()
-        print(f"End of map {_ranges}.")
-        print(f"New seed ranges: {new_seed_ranges}")
-        seed_ranges = new_seed_ranges
-        print("-" * 20)
-        print()
+    if log.isEnabledFor(TRACE):
+        log.log(TRACE, "Seed ranges: %s", list(seeds))
+        log.log(TRACE, "Location ranges: %s", list(locations))
+    log.debug("%s seed ranges, %s location ranges", len(seeds), len(locations))
 
-    print(sorted(seed_ranges))
-    _print(min(seed_ranges)[0])
+    return locations.min()
 
 
 if __name__ == "__main__":
-    input_file = get_input(5, iterator=True)
-    print(solve_part_one(input_file))
-    input_file = get_input(5, iterator=True)
-    print(solve_part_two(input_file))
+    from aoc import run_day
+
+    run_day(5)
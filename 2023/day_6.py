@@ -50,8 +50,6 @@ Determine the number of ways you could beat the record in each race. What do you
 
 import math
 
-from utils import get_input
-
 
 def parse_part_one_input(data: list[str]) -> tuple[list[int], list[int]]:
     """Parse the input data."""
@@ -137,7 +135,8 @@ def solve_part_two(data):
 
     return floored_root2 - ceiled_root1 + 1
 
+
 if __name__ == "__main__":
-    data = get_input(6)
-    print(solve_part_one(data.splitlines()))
-    print(solve_part_two(data.splitlines()))
\ No newline at end of file
+    from aoc import run_day
+
+    run_day(6)
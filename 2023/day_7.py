@@ -85,13 +85,16 @@ Using the new joker rule, find the rank of every hand in your set. What are the
 
 from collections import Counter
 from functools import partial
+from typing import Iterable
 
-from utils import get_input
+from utils import nonblank_lines
 
 HANDS = "AKQJT98765432"[::-1]
 
 HANDS_PART_TWO = "AKQT98765432J"[::-1]
 
+BID_BITS = 32
+
 
 def is_five_of_a_kind(hand: str) -> bool:
     """Return True if the hand is five of a kind."""
@@ -242,7 +245,39 @@ def solve_part_two(data):
     return amount
 
 
+def hand_key(hand: str, substitute_joker: bool = False) -> int:
+    """Return a single int that sorts hands the same way as the solvers do: by rank, then card by card."""
+    order = HANDS_PART_TWO if substitute_joker else HANDS
+    key = get_hand_rank(hand, substitute_joker=substitute_joker)
+    for card in hand:
+        key = key * len(order) + order.index(card)
+    return key
+
+
+def solve_stream(lines: Iterable[str]) -> tuple[int, int]:
+    """Solve both parts, keeping a single int per hand and part."""
+    # Ranking needs every hand, so instead of the hand strings each part keeps the bid packed below the
+    # sort key of the hand.
+    packed_one = []
+    packed_two = []
+    for line in nonblank_lines(lines):
+        hand, bid = line.split()
+        bid = int(bid)
+        if not 0 <= bid < 1 << BID_BITS:
+            raise ValueError(f"Bid {bid} does not fit in {BID_BITS} bits")
+        packed_one.append(hand_key(hand) << BID_BITS | bid)
+        packed_two.append(hand_key(hand, substitute_joker=True) << BID_BITS | bid)
+
+    answers = []
+    for packed in (packed_one, packed_two):
+        packed.sort()
+        mask = (1 << BID_BITS) - 1
+        answers.append(sum(rank * (item & mask) for rank, item in enumerate(packed, start=1)))
+
+    return answers[0], answers[1]
+
+
 if __name__ == "__main__":
-    data = get_input(7).splitlines()
-    print(solve_part_one(data))
-    print(solve_part_two(data))
+    from aoc import run_day
+
+    run_day(7)
@@ -71,8 +71,7 @@ So, in this example, you end up entirely on nodes that end in Z after 6 steps.
 Simultaneously start on every node that ends with A. How many steps does it take before you're only on nodes that end with Z?
 """
 
-from utils import get_input
-from itertools import cycle, tee
+from itertools import cycle
 from math import lcm
 
 from typing import Iterator, NamedTuple
@@ -146,6 +145,6 @@ def solve_part_two(data: list[str]) -> int:
 
 
 if __name__ == "__main__":
-    lines_1, lines_2 = tee(get_input(8, iterator=True), 2)
-    print(solve_part_one(lines_1))
-    print(solve_part_two(lines_2))
+    from aoc import run_day
+
+    run_day(8)
@@ -96,13 +96,10 @@ Doing this for the remaining example data above results in previous values of -3
 Analyze your OASIS report again, this time extrapolating the previous value for each history. What is the sum of these extrapolated values?
 """
 
-from itertools import tee
-from typing import Iterator
+from typing import Iterable, Iterator
 
-from utils import get_input
 
-
-def parse_input(lines: Iterator[str]):
+def parse_input(lines: Iterator[str | bytes]):
     """Parse the input data."""
     return [list(map(int, line.split())) for line in lines]
 
@@ -159,7 +156,35 @@ def solve_part_two(data: Iterator[str]) -> int:
     return sum
 
 
+def extrapolate(row: list[int]) -> tuple[int, int]:
+    """Return the next and the previous value of a sequence.
+
+    Same difference rows as the solvers, but only the current one is kept: the next value is the sum
+    of the last values of all rows, the previous one the alternating sum of their first values.
+    """
+    next_value = previous_value = 0
+    sign = 1
+    while any(row):
+        next_value += row[-1]
+        previous_value += sign * row[0]
+        sign = -sign
+        row = [a - b for a, b in zip(row[1:], row[:-1])]
+
+    return next_value, previous_value
+
+
+def solve_stream(lines: Iterable[str | bytes]) -> tuple[int, int]:
+    """Solve both parts, one sequence at a time, from lines of either str or bytes."""
+    part_one = part_two = 0
+    for line in lines:
+        next_value, previous_value = extrapolate(list(map(int, line.split())))
+        part_one += next_value
+        part_two += previous_value
+
+    return part_one, part_two
+
+
 if __name__ == "__main__":
-    lines_1, lines_2 = tee(get_input(9, iterator=True), 2)
-    print(solve_part_one(data=lines_1))
-    print(solve_part_two(data=lines_2))
+    from aoc import run_day
+
+    run_day(9)
@@ -0,0 +1,404 @@
+"""Deterministic generators of large, valid puzzle inputs.
+
+Every generator takes a size in the unit that matters for its day (lines, games, grid side, ranges per map,
+hands, nodes...) and a seed, so the same call always produces the same file. Where the answers can be worked
+out while generating, or with a simple reference that does not share code with the solvers, they are
+returned along with the text.
+
+Usage:
+    python generators.py 3 10000 -o /tmp/day_3.txt    # a 10k x 10k engine schematic
+"""
+import argparse
+import bisect
+import math
+import random
+import re
+import string
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+DIGIT_WORDS = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+
+COLORS = ["red", "green", "blue"]
+
+# The bag of part one, games that fit in it count towards the answer.
+BAG = {"red": 12, "green": 13, "blue": 14}
+
+# Symbols that show up in the real engine schematics.
+SCHEMATIC_SYMBOLS = "*#+$/=%@&-"
+
+CARDS = "AKQJT98765432"
+
+
+class Generated(NamedTuple):
+    text: str
+    # Answers of part one and part two, None where they are not known up front.
+    answers: tuple[int | None, int | None]
+
+
+def generate_day_1(lines: int, rng: random.Random) -> Generated:
+    """Calibration lines mixing letters, digits and spelled out digits."""
+    # The answers come from an overlapping regex search, which is independent of the solvers' scanning.
+    pattern = re.compile(r"(?=(\d|" + "|".join(DIGIT_WORDS) + "))")
+    output = []
+    part_one = part_two = 0
+    for _ in range(lines):
+        tokens = [str(rng.randint(1, 9))]
+        for _ in range(rng.randint(0, 7)):
+            kind = rng.random()
+            if kind < 0.3:
+                tokens.append(str(rng.randint(1, 9)))
+            elif kind < 0.6:
+                tokens.append(rng.choice(DIGIT_WORDS))
+            else:
+                tokens.append("".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 4))))
+        rng.shuffle(tokens)
+        line = "".join(tokens)
+        output.append(line)
+
+        digits = [c for c in line if c.isdigit()]
+        part_one += int(digits[0] + digits[-1])
+        found = [m if m.isdigit() else str(DIGIT_WORDS.index(m) + 1) for m in pattern.findall(line)]
+        part_two += int(found[0] + found[-1])
+
+    return Generated("\n".join(output) + "\n", (part_one, part_two))
+
+
+def generate_day_2(games: int, rng: random.Random) -> Generated:
+    """Games of cube draws, every color showing up at least once per game."""
+    output = []
+    part_one = part_two = 0
+    for game_id in range(1, games + 1):
+        draws = [{} for _ in range(rng.randint(1, 6))]
+        for color in COLORS:
+            draws[rng.randrange(len(draws))][color] = rng.randint(1, 20)
+        for draw in draws:
+            for color in COLORS:
+                if color not in draw and (not draw or rng.random() < 0.5):
+                    draw[color] = rng.randint(1, 20)
+
+        maxima = {color: max(draw.get(color, 0) for draw in draws) for color in COLORS}
+        if all(maxima[color] <= BAG[color] for color in COLORS):
+            part_one += game_id
+        part_two += math.prod(maxima.values())
+
+        formatted = "; ".join(", ".join(f"{count} {color}" for color, count in draw.items()) for draw in draws)
+        output.append(f"Game {game_id}: {formatted}")
+
+    return Generated("\n".join(output) + "\n", (part_one, part_two))
+
+
+def generate_day_3(side: int, rng: random.Random) -> Generated:
+    """A square engine schematic of numbers and symbols scattered over dots."""
+    rows = []
+    # Per row: the numbers as (value, start, end) and the symbols as (column, symbol), both sorted by column.
+    numbers_per_row = []
+    symbols_per_row = []
+    for _ in range(side):
+        row = []
+        numbers = []
+        symbols = []
+        col = 0
+        while col < side:
+            kind = rng.random()
+            width = rng.randint(1, 3)
+            if kind < 0.12 and col + width <= side:
+                value = rng.randint(10 ** (width - 1), 10**width - 1)
+                numbers.append((value, col, col + width - 1))
+                row.append(str(value))
+                col += width
+                # Keep a gap so that two numbers never run into each other.
+                if col < side:
+                    row.append(".")
+                    col += 1
+            elif kind < 0.17:
+                symbol = rng.choice(SCHEMATIC_SYMBOLS)
+                symbols.append((col, symbol))
+                row.append(symbol)
+                col += 1
+            else:
+                row.append(".")
+                col += 1
+        rows.append("".join(row))
+        numbers_per_row.append(numbers)
+        symbols_per_row.append(symbols)
+
+    part_one = part_two = 0
+    for index in range(side):
+        neighbours = range(max(0, index - 1), min(side, index + 2))
+        for value, start, end in numbers_per_row[index]:
+            for other in neighbours:
+                columns = [col for col, _ in symbols_per_row[other]]
+                position = bisect.bisect_left(columns, start - 1)
+                if position < len(columns) and columns[position] <= end + 1:
+                    part_one += value
+                    break
+
+        for col, symbol in symbols_per_row[index]:
+            if symbol != "*":
+                continue
+            adjacent = [
+                value
+                for other in neighbours
+                for value, start, end in numbers_per_row[other]
+                if start - 1 <= col <= end + 1
+            ]
+            if len(adjacent) == 2:
+                part_two += adjacent[0] * adjacent[1]
+
+    return Generated("\n".join(rows) + "\n", (part_one, part_two))
+
+
+def generate_day_4(cards: int, rng: random.Random, winning: int = 10, yours: int = 25) -> Generated:
+    """Scratchcards that never win copies of cards past the end of the table."""
+    output = []
+    matches = []
+    for card in range(1, cards + 1):
+        # Mostly losing cards, like the real pile, so the number of copies does not explode.
+        count = min(rng.choice([0] * 20 + [1, 1, 2, 3, 5, 10]), cards - card, winning)
+        winning_numbers = rng.sample(range(1, 100), winning)
+        others = [n for n in range(1, 100) if n not in winning_numbers]
+        your_numbers = rng.sample(winning_numbers, count) + rng.sample(others, yours - count)
+        rng.shuffle(your_numbers)
+        output.append(
+            f"Card {card:>{len(str(cards))}}: "
+            f"{' '.join(f'{n:>2}' for n in winning_numbers)} | {' '.join(f'{n:>2}' for n in your_numbers)}"
+        )
+        matches.append(count)
+
+    part_one = sum(2 ** (count - 1) for count in matches if count)
+    copies = [1] * cards
+    for index, count in enumerate(matches):
+        for other in range(index + 1, index + count + 1):
+            copies[other] += copies[index]
+
+    return Generated("\n".join(output) + "\n", (part_one, sum(copies)))
+
+
+def generate_day_5(ranges: int, rng: random.Random, limit: int = 2**32) -> Generated:
+    """An almanac whose seven maps each cover some slices of [0, limit) with the given number of ranges."""
+    names = ["seed", "soil", "fertilizer", "water", "light", "temperature", "humidity", "location"]
+    seeds = []
+    for _ in range(max(10, ranges // 4)):
+        start = rng.randrange(limit // 2)
+        seeds.extend([start, rng.randint(1, limit // 16)])
+
+    sections = [f"seeds: {' '.join(map(str, seeds))}"]
+    maps = []
+    for source, destination in zip(names, names[1:]):
+        cuts = sorted(rng.sample(range(1, limit), 2 * ranges))
+        entries = []
+        for start, end in zip(cuts[::2], cuts[1::2]):
+            entries.append((rng.randrange(limit - (end - start)), start, end - start))
+        maps.append(sorted(entries, key=lambda entry: entry[1]))
+        rng.shuffle(entries)
+        lines = "\n".join(" ".join(map(str, entry)) for entry in entries)
+        sections.append(f"{source}-to-{destination} map:\n{lines}")
+
+    # Part one only needs to follow each seed, the sources of a map never overlap.
+    part_one = None
+    for key in seeds:
+        for entries in maps:
+            position = bisect.bisect_right(entries, key, key=lambda entry: entry[1]) - 1
+            if position >= 0 and key < entries[position][1] + entries[position][2]:
+                key += entries[position][0] - entries[position][1]
+        part_one = key if part_one is None else min(part_one, key)
+
+    return Generated("\n\n".join(sections) + "\n", (part_one, None))
+
+
+def count_ways_to_win(time: int, distance: int) -> int:
+    """Count the hold times that go further than the distance, in exact integer arithmetic."""
+    low, high = 0, time // 2
+    # Find the first hold time that beats the record, the winning times are symmetric around time / 2.
+    if high * (time - high) <= distance:
+        return 0
+    while low < high:
+        middle = (low + high) // 2
+        if middle * (time - middle) > distance:
+            high = middle
+        else:
+            low = middle + 1
+    return time - 2 * low + 1
+
+
+def generate_day_6(races: int, rng: random.Random) -> Generated:
+    """Races whose records can always be beaten."""
+    times = [rng.randint(10, 99) for _ in range(races)]
+    distances = [rng.randint(time, (time // 2) * (time - time // 2) - 1) for time in times]
+    part_one = math.prod(count_ways_to_win(time, distance) for time, distance in zip(times, distances))
+    part_two = count_ways_to_win(int("".join(map(str, times))), int("".join(map(str, distances))))
+
+    width = max(len(str(n)) for n in times + distances) + 1
+    text = (
+        "Time:    " + "".join(f"{n:>{width}}" for n in times) + "\n"
+        "Distance:" + "".join(f"{n:>{width}}" for n in distances) + "\n"
+    )
+    return Generated(text, (part_one, part_two))
+
+
+def camel_cards_key(hand: str, jokers: bool) -> tuple:
+    """Sort key of a hand: the sorted card counts, then the card strengths."""
+    order = "J23456789TQKA" if jokers else "23456789TJQKA"
+    counts = Counter(hand.replace("J", "") if jokers else hand)
+    shape = sorted(counts.values(), reverse=True) or [0]
+    if jokers:
+        shape[0] += hand.count("J")
+    return shape, [order.index(card) for card in hand]
+
+
+def generate_day_7(hands: int, rng: random.Random) -> Generated:
+    """Camel Cards hands with their bids.
+
+    Big files repeat hands, every copy of a hand gets the same bid so that the order of ties does not matter.
+    """
+    bids = {}
+    plays = []
+    for _ in range(hands):
+        hand = "".join(rng.choices(CARDS, k=5))
+        plays.append((hand, bids.setdefault(hand, rng.randint(1, 1000))))
+    answers = []
+    for jokers in (False, True):
+        ranked = sorted(plays, key=lambda play: camel_cards_key(play[0], jokers))
+        answers.append(sum(rank * bid for rank, (_, bid) in enumerate(ranked, start=1)))
+
+    return Generated("\n".join(f"{hand} {bid}" for hand, bid in plays) + "\n", tuple(answers))
+
+
+def primes_from(start: int, count: int, exclude: int = 0) -> list[int]:
+    """Return the first `count` primes that are >= start, skipping `exclude`."""
+    primes = []
+    candidate = max(2, start)
+    while len(primes) < count:
+        if candidate != exclude and all(candidate % p for p in range(2, math.isqrt(candidate) + 1)):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def generate_day_8(nodes: int, rng: random.Random, ghosts: int = 6) -> Generated:
+    """A network with the structure of the real puzzle.
+
+    Every ghost walks a loop of `k * len(instructions)` nodes that is only ever entered at the same offset
+    of the instructions: its start node ..A points to the same nodes as its end node ..Z, which closes the loop.
+    The first ghost starts at AAA and ends at ZZZ, so part one is the length of its loop and part two is the
+    least common multiple of all loop lengths.
+    """
+    per_ghost = max(4, nodes // ghosts)
+    length = primes_from(max(2, math.isqrt(per_ghost) // 2), 1)[0]
+    multipliers = primes_from(max(2, per_ghost // length), ghosts, exclude=length)
+
+    name_length = 3
+    while 24 ** (name_length - 1) * 26 < 2 * nodes:
+        name_length += 1
+
+    used = {"AAA", "ZZZ"}
+
+    def new_name(last: str = "") -> str:
+        while True:
+            name = "".join(rng.choices(string.ascii_uppercase, k=name_length - 1))
+            name += last or rng.choice(string.ascii_uppercase[1:-1])
+            if name not in used:
+                used.add(name)
+                return name
+
+    instructions = "".join(rng.choices("LR", k=length))
+    loops = []
+    for ghost, multiplier in enumerate(multipliers):
+        end = "ZZZ" if ghost == 0 else new_name("Z")
+        loops.append([end] + [new_name() for _ in range(multiplier * length - 1)])
+    all_loop_nodes = [name for loop in loops for name in loop]
+
+    lines = []
+    for ghost, loop in enumerate(loops):
+        start = "AAA" if ghost == 0 else new_name("A")
+        for index, name in enumerate(loop):
+            following = loop[(index + 1) % len(loop)]
+            # The other direction is never taken on the loop, point it anywhere.
+            other = rng.choice(all_loop_nodes)
+            left, right = (following, other) if instructions[index % length] == "L" else (other, following)
+            lines.append(f"{name} = ({left}, {right})")
+            if index == 0:
+                lines.append(f"{start} = ({left}, {right})")
+    rng.shuffle(lines)
+
+    loop_lengths = [len(loop) for loop in loops]
+    text = f"{instructions}\n\n" + "\n".join(lines) + "\n"
+    return Generated(text, (loop_lengths[0], math.lcm(*loop_lengths)))
+
+
+def generate_day_9(lines: int, rng: random.Random, length: int = 21) -> Generated:
+    """Sequences sampled from integer polynomials, extrapolated by evaluating the polynomial."""
+    output = []
+    part_one = part_two = 0
+    for _ in range(lines):
+        coefficients = [rng.randint(-5, 5) for _ in range(rng.randint(1, 7))]
+
+        def value(x: int) -> int:
+            return sum(c * x**power for power, c in enumerate(coefficients))
+
+        output.append(" ".join(str(value(x)) for x in range(length)))
+        part_one += value(length)
+        part_two += value(-1)
+
+    return Generated("\n".join(output) + "\n", (part_one, part_two))
+
+
+GENERATORS: dict[int, Callable[..., Generated]] = {
+    1: generate_day_1,
+    2: generate_day_2,
+    3: generate_day_3,
+    4: generate_day_4,
+    5: generate_day_5,
+    6: generate_day_6,
+    7: generate_day_7,
+    8: generate_day_8,
+    9: generate_day_9,
+}
+
+# The size that roughly matches the real input of each day, and in how many dimensions the size grows
+# (the schematic of day 3 is square, so 10x the cells is ~3.2x the side).
+REAL_SIZES: dict[int, tuple[int, int]] = {
+    1: (1000, 1),
+    2: (100, 1),
+    3: (140, 2),
+    4: (200, 1),
+    5: (40, 1),
+    6: (4, 1),
+    7: (1000, 1),
+    8: (750, 1),
+    9: (200, 1),
+}
+
+
+def generate(day: int, size: int, seed: int = 0) -> Generated:
+    """Generate the input of a day at the given size."""
+    return GENERATORS[day](size, random.Random(seed))
+
+
+def scaled_size(day: int, scale: float) -> int:
+    """Return the size that makes an input about `scale` times as big as the real one."""
+    size, dimensions = REAL_SIZES[day]
+    return max(1, round(size * scale ** (1 / dimensions)))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("day", type=int, choices=sorted(GENERATORS))
+    parser.add_argument("size", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", type=Path, help="file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    generated = generate(args.day, args.size, args.seed)
+    if args.output:
+        args.output.write_text(generated.text)
+    else:
+        sys.stdout.write(generated.text)
+    print(f"Answers: {generated.answers[0]} {generated.answers[1]}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
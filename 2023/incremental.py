@@ -0,0 +1,152 @@
+"""Re-solve append-only inputs by only reading the bytes added since the last run.
+
+The answers of days 1, 2, 4 and 9 are sums over the lines of the input (day 4 also carries the copies won
+by the last few cards), so the running totals after the last complete line are all that is needed to carry
+on. They are checkpointed in `.cache/incremental/` along with the byte offset they stop at.
+
+A checkpoint is only trusted when the file is at least as long as the offset, the bytes just before the
+offset still hash the same (a cheap guard against a file that was rewritten rather than appended to) and
+the solver code did not change. Otherwise the file is solved from the start again.
+"""
+import copy
+import hashlib
+import pickle
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+import day_1
+import day_2
+import day_4
+import day_9
+from cache import CACHE_DIR, hash_source, write_atomically
+from utils import get_input_path
+
+# How many bytes before the offset are hashed to check that the file was only appended to.
+TAIL_SIZE = 4096
+
+
+def day_1_values(line: str) -> tuple[int, int]:
+    return day_1.calibration_value(line), day_1.calibration_value_with_words(line)
+
+
+def day_2_values(line: str) -> tuple[int, int]:
+    game_id, matches = day_2.parse_line(line)
+    return game_id if day_2.is_possible(matches) else 0, day_2.power(matches)
+
+
+def day_9_values(line: str) -> tuple[int, int]:
+    return day_9.extrapolate(list(map(int, line.split())))
+
+
+class SumTally:
+    """Running answers of a day whose answers are sums of values computed line by line."""
+
+    def __init__(self, values: Callable[[str], tuple[int, int]]):
+        self.values = values
+        self.part_one = self.part_two = 0
+
+    def add(self, line: str) -> None:
+        part_one, part_two = self.values(line)
+        self.part_one += part_one
+        self.part_two += part_two
+
+    def answers(self) -> tuple[int, int]:
+        return self.part_one, self.part_two
+
+
+# The tally of an empty input, for every day that can be solved incrementally.
+TALLIES: dict[int, Callable[[], object]] = {
+    1: lambda: SumTally(day_1_values),
+    2: lambda: SumTally(day_2_values),
+    4: day_4.ScratchcardTally,
+    9: lambda: SumTally(day_9_values),
+}
+
+
+class Checkpoint(NamedTuple):
+    source_hash: str
+    offset: int
+    tail_hash: str
+    tally: object
+
+
+def hash_tail(data: bytes) -> str:
+    return hashlib.blake2b(data).hexdigest()
+
+
+def hash_solver(day: int) -> str:
+    """Return the hash of the code that fills the tally of a day: its module and this one."""
+    return hash_source(f"day_{day}") + hash_source(__name__)
+
+
+def checkpoint_path(day: int) -> Path:
+    return CACHE_DIR / "incremental" / f"day_{day}.pickle"
+
+
+def load_checkpoint(day: int, path: Path) -> Checkpoint | None:
+    """Return the checkpoint of a day if it still applies to the input file."""
+    try:
+        checkpoint = pickle.loads(checkpoint_path(day).read_bytes())
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+
+    if checkpoint.source_hash != hash_solver(day):
+        return None
+    with path.open("rb") as file:
+        file.seek(max(0, checkpoint.offset - TAIL_SIZE))
+        tail = file.read(min(checkpoint.offset, TAIL_SIZE))
+    if len(tail) != min(checkpoint.offset, TAIL_SIZE) or hash_tail(tail) != checkpoint.tail_hash:
+        return None
+    return checkpoint
+
+
+class IncrementalAnswers(NamedTuple):
+    part_one: int
+    part_two: int
+    # How many bytes had to be read, and how many of them are an unterminated last line that is left out.
+    new_bytes: int
+    pending: int
+
+
+def solve_incremental(day: int) -> IncrementalAnswers:
+    """Solve both parts of a day, reading only what was appended since the last run.
+
+    A last line without a line ending may still be half written. It counts towards the answers when it
+    parses, since inputs don't have to end with a line ending, but never towards the checkpoint. When it
+    doesn't parse the answers are those of the complete lines, and the line is reported as pending.
+    """
+    if day not in TALLIES:
+        raise ValueError(f"Day {day} can't be solved incrementally")
+
+    path = get_input_path(day)
+    checkpoint = load_checkpoint(day, path)
+    offset = checkpoint.offset if checkpoint else 0
+    tally = checkpoint.tally if checkpoint else TALLIES[day]()
+
+    with path.open("rb") as file:
+        file.seek(offset)
+        new_bytes = file.read()
+
+    complete, separator, partial = new_bytes.rpartition(b"\n")
+    for line in complete.decode().splitlines():
+        if line:
+            tally.add(line)
+    offset += len(complete) + len(separator)
+
+    with path.open("rb") as file:
+        file.seek(max(0, offset - TAIL_SIZE))
+        tail = file.read(min(offset, TAIL_SIZE))
+    data = pickle.dumps(Checkpoint(hash_solver(day), offset, hash_tail(tail), tally), protocol=pickle.HIGHEST_PROTOCOL)
+    write_atomically(checkpoint_path(day), data)
+
+    pending = 0
+    if partial.rstrip(b"\r"):
+        with_partial = copy.deepcopy(tally)
+        try:
+            with_partial.add(partial.decode().rstrip("\r"))
+        except (ValueError, KeyError, IndexError):
+            pending = len(partial)
+        else:
+            tally = with_partial
+
+    return IncrementalAnswers(*tally.answers(), len(new_bytes), pending)
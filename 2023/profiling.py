@@ -0,0 +1,173 @@
+"""Profile solvers with cProfile, tracemalloc and, optionally, a sampler of stacks for flame graphs.
+
+Every capture is written to a file named after the day and part, e.g. for day 5 part 2:
+
+    day_5_part_2.prof          cProfile stats, for `python -m pstats` or snakeviz
+    day_5_part_2.memory.txt    peak traced memory and the top allocation sites alive around the peak
+    day_5_part_2.folded        sampled stacks in the collapsed format of flamegraph.pl and speedscope
+
+The solver runs three times: under cProfile (and the sampler), under tracemalloc alone for the peak, and
+under tracemalloc with a thread that snapshots the allocations whenever they reach a new high, so that
+none of them skews the numbers of the others. Without profiling the runner calls the solvers directly, none of this is
+in the way.
+"""
+import cProfile
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, NamedTuple
+
+# Frames kept per traced allocation, enough to tell apart the callers of a helper.
+TRACEMALLOC_FRAMES = 10
+
+TOP_ALLOCATIONS = 15
+
+# Seconds between two checks of the traced memory, while looking for the peak to snapshot.
+MEMORY_SAMPLE_INTERVAL = 0.001
+
+
+class ProfileOptions(NamedTuple):
+    directory: Path
+    # Seconds between two stack samples, None to skip the flame graph.
+    sample_interval: float | None = None
+
+
+class StackSampler(threading.Thread):
+    """Count the stacks of another thread, sampled at a fixed interval.
+
+    Frames above the first call to `profile_call` (the runner, the process pool) are left out.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame.f_code is not profile_call.__code__:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+    def write_folded(self, path: Path) -> None:
+        """Write one `stack count` line per distinct stack."""
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()))
+
+
+class PeakSnapshotter(threading.Thread):
+    """Snapshot the traced memory each time it is higher than at the last snapshot.
+
+    tracemalloc only keeps the size of the peak, not what was allocated at the time; the largest snapshot
+    is as close to the peak as the sampling interval gets. Snapshots are traced too, so the memory the
+    kept one takes is left out when comparing.
+    """
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.snapshot = None
+        # Traced memory of the solver at the kept snapshot, and of the snapshot itself.
+        self.size = 0
+        self._overhead = 0
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        current = tracemalloc.get_traced_memory()[0] - self._overhead
+        if self.snapshot is None or current > self.size:
+            self.snapshot = None
+            before = tracemalloc.get_traced_memory()[0]
+            self.snapshot = tracemalloc.take_snapshot()
+            self._overhead = tracemalloc.get_traced_memory()[0] - before
+            self.size = before
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+        # Solvers shorter than the interval are never sampled while they run.
+        self.sample()
+
+
+def write_memory_report(path: Path, peak: int, snapshot: tracemalloc.Snapshot, size: int) -> None:
+    """Write the peak memory and the lines that allocated the most of what was alive at the snapshot."""
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        # The snapshotter thread itself.
+        tracemalloc.Filter(False, threading.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+    lines = [
+        f"Peak traced memory: {peak / 2**20:.2f} MiB",
+        "",
+        f"Top {TOP_ALLOCATIONS} allocation sites alive at the largest snapshot ({size / 2**20:.2f} MiB):",
+    ]
+    for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 2**10:>10.1f} KiB {stat.count:>8} blocks  {frame.filename}:{frame.lineno}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def profile_call(call: Callable[[], Any], name: str, options: ProfileOptions) -> Any:
+    """Run `call` under the profilers, write their reports under `name` and return its result."""
+    options.directory.mkdir(parents=True, exist_ok=True)
+
+    profiler = cProfile.Profile()
+    sampler = None
+    switch_interval = sys.getswitchinterval()
+    if options.sample_interval:
+        sampler = StackSampler(threading.get_ident(), options.sample_interval)
+        # The sampler only gets to run when the solver hands over the GIL, which happens every 5 ms by default.
+        sys.setswitchinterval(min(switch_interval, options.sample_interval))
+        sampler.start()
+    try:
+        result = profiler.runcall(call)
+    finally:
+        if sampler is not None:
+            sampler.stop()
+            sys.setswitchinterval(switch_interval)
+
+    profiler.dump_stats(options.directory / f"{name}.prof")
+    if sampler is not None:
+        sampler.write_folded(options.directory / f"{name}.folded")
+
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    try:
+        # Keep the result alive until the peak is read, it is part of what the solver allocated.
+        traced_result = call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del traced_result
+
+    snapshotter = PeakSnapshotter(MEMORY_SAMPLE_INTERVAL)
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    sys.setswitchinterval(min(switch_interval, MEMORY_SAMPLE_INTERVAL))
+    snapshotter.start()
+    try:
+        traced_result = call()
+    finally:
+        snapshotter.stop()
+        sys.setswitchinterval(switch_interval)
+        tracemalloc.stop()
+    del traced_result
+    write_memory_report(options.directory / f"{name}.memory.txt", peak, snapshotter.snapshot, snapshotter.size)
+
+    return result
+
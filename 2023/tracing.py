@@ -0,0 +1,52 @@
+"""Per-day tracing with levels, free on hot paths when it is switched off.
+
+Every day logs to its own logger, `aoc.day_N`, which stays silent until it is switched on from the command
+line, e.g. `python aoc.py 5 --trace 5` or `--trace 5=debug`. Hot loops look the level up once, before the
+loop, and guard every message with a local flag:
+
+    log = get_logger(5)
+    tracing = log.isEnabledFor(TRACE)
+    for ...:
+        if tracing:
+            log.log(TRACE, "Seed range: %s - %s", start, end)
+
+so a disabled trace costs the test of a local variable: the message is never formatted and, unlike a call
+to a no-op function, its arguments are never even built.
+"""
+import logging
+import sys
+
+# Finer than DEBUG: one message per step of the inner loops.
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+
+LOGGER_NAME = "aoc"
+
+FORMAT = "%(name)s %(levelname)s %(message)s"
+
+
+def get_logger(day: int) -> logging.Logger:
+    """Return the logger of a day."""
+    return logging.getLogger(f"{LOGGER_NAME}.day_{day}")
+
+
+def parse_trace(spec: str) -> tuple[int, int]:
+    """Parse a `DAY` or `DAY=LEVEL` command line argument into a day and a logging level."""
+    day, _, level = spec.partition("=")
+    level = level.upper() or "TRACE"
+    if not isinstance(logging.getLevelName(level), int):
+        raise ValueError(f"Unknown trace level: {level}")
+    return int(day), logging.getLevelName(level)
+
+
+def configure(levels: dict[int, int]) -> None:
+    """Send the messages of the given days, from the given level up, to stderr."""
+    root = logging.getLogger(LOGGER_NAME)
+    if not root.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter(FORMAT))
+        root.addHandler(handler)
+        root.propagate = False
+
+    for day, level in levels.items():
+        get_logger(day).setLevel(level)
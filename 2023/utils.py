@@ -1,9 +1,144 @@
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, TextIO
 
-def get_input(day: int, iterator: bool = False) -> str:
-    """Return the input for the given day."""
-    file_obj = (Path(__file__).parent / f"inputs/day_{day}.txt")
+# Point the solvers at another directory of inputs, e.g. the scaled up ones used by the benchmarks.
+INPUTS_DIR_VARIABLE = "AOC_INPUTS_DIR"
+
+
+class MappedInput:
+    """A read-only memory map of an input file.
+
+    Nothing is read up front: the OS pages the file in as it is accessed and can drop those pages again
+    under memory pressure, so even inputs of several GB never get copied into the process.
+    The file handle is closed as soon as the map exists, the map itself is closed by `close()`
+    or when leaving the `with` block, see `close()` for views of `buffer` that outlive it.
+    """
+
+    def __init__(self, path: Path):
+        with path.open("rb") as file:
+            # Empty files cannot be mapped.
+            size = os.fstat(file.fileno()).st_size
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+        if self._map is not None and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+        self.buffer = memoryview(self._map if self._map is not None else b"")
+
+    def find(self, sub: bytes, start: int = 0, end: int | None = None) -> int:
+        """Return the offset of the first `sub` in a range of bytes, -1 if there is none."""
+        if self._map is None:
+            return -1
+        return self._map.find(sub, start, len(self.buffer) if end is None else end)
+
+    def lines(self, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+        """Yield every line, without its line ending.
+
+        Each line is copied out of the map on its own, so lines are safe to keep after the map is closed.
+        `start` and `end` limit the lines to a range of bytes, `start` should be the start of a line.
+        """
+        if self._map is None:
+            return
+        end = len(self.buffer) if end is None else min(end, len(self.buffer))
+        while start < end:
+            stop = self.find(b"\n", start, end)
+            if stop == -1:
+                stop = end
+            line = self._map[start:stop]
+            yield line[:-1] if line.endswith(b"\r") else line
+            start = stop + 1
+
+    def line_boundaries(self, chunks: int) -> list[int]:
+        """Split the map into about `chunks` ranges of bytes that start and end on line boundaries.
+
+        Returns the offsets between the ranges, from 0 to the size of the map.
+        """
+        size = len(self.buffer)
+        boundaries = [0]
+        for chunk in range(1, chunks):
+            target = max(size * chunk // chunks, boundaries[-1])
+            newline = self.find(b"\n", target)
+            if newline == -1:
+                break
+            if newline + 1 > boundaries[-1]:
+                boundaries.append(newline + 1)
+        if boundaries[-1] != size:
+            boundaries.append(size)
+        return boundaries
+
+    def close(self) -> None:
+        """Release the buffer and unmap the file.
+
+        Views sliced from `buffer` that are still alive keep the map open: it is then unmapped by the
+        garbage collector once the last of them is gone, rather than failing here.
+        """
+        self.buffer.release()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                pass
+
+    def __enter__(self) -> "MappedInput":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def get_input_path(day: int) -> Path:
+    """Return the path of the input file for the given day."""
+    inputs_dir = os.environ.get(INPUTS_DIR_VARIABLE) or Path(__file__).parent / "inputs"
+    return Path(inputs_dir) / f"day_{day}.txt"
+
+
+def get_input(day: int, iterator: bool = False, mapped: bool = False) -> str | TextIO | MappedInput:
+    """Return the input for the given day.
+
+    With `mapped` the file is memory-mapped instead of read, see `MappedInput`.
+    """
+    file_obj = get_input_path(day)
+    if mapped:
+        return MappedInput(file_obj)
     if iterator:
         return file_obj.open()
     else:
         return file_obj.read_text()
+
+
+def nonblank_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Yield the lines of any iterable of lines, e.g. an open file or stdin, for the streaming solvers.
+
+    Line endings are stripped and blank lines skipped, so that a solver sees the same lines wherever they
+    come from, and only ever holds the current one.
+    """
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line:
+            yield line
+
+
+def sum_over_line_ranges(
+    path: Path, worker: Callable[[Path, int, int], tuple[int, ...]], workers: int | None = None, min_size: int = 2**20
+) -> tuple[int, ...]:
+    """Split a file into ranges of whole lines, call `worker(path, start, end)` on each in a process pool
+    and return the sums of what they return, item by item.
+
+    The workers map the file themselves, so only the path and the offsets travel between the processes.
+    There are a few ranges per worker so that a slow range doesn't hold the others up,
+    but none smaller than `min_size` bytes: small inputs are not worth the trip to another process.
+    """
+    workers = workers or os.cpu_count() or 1
+    with MappedInput(path) as data:
+        boundaries = data.line_boundaries(max(1, min(workers * 4, len(data.buffer) // min_size)))
+    # An empty file still gets one (empty) range, for the worker to say what nothing adds up to.
+    if len(boundaries) == 1:
+        boundaries.append(boundaries[0])
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(worker, repeat(path), boundaries[:-1], boundaries[1:]))
+
+    return tuple(map(sum, zip(*results)))